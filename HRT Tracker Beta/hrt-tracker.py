@@ -1,19 +1,26 @@
-import customtkinter as ctk
-import json
+import time
 import os
-import shutil
-from datetime import datetime, date
-from tkinter import messagebox
-from pathlib import Path
-import webbrowser
-from tkinter import filedialog
-import ctypes  # added for monitor detection
-from ctypes import Structure, c_long, c_ulong, byref  # added
-import platform  # NEW: environment info for bug reports
-from urllib.parse import quote  # NEW: encode subject/body for Gmail compose links
-import calendar  # NEW: calendar popup support
 import sys  # NEW: for PyInstaller detection
 
+# Startup timing: (phase name, perf_counter_ns at the end of the phase).
+# Consumed by StartupTimer; written out with --profile-startup or HRT_PROFILE_STARTUP.
+_STARTUP_MARKS = [("process start", time.perf_counter_ns())]
+_PROFILE_STARTUP = os.environ.get("HRT_PROFILE_STARTUP", "") or next(
+    (a.partition("=")[2] or "1" for a in sys.argv[1:] if a.startswith("--profile-startup")), ""
+)
+_STARTUP_PROFILER = None
+if _PROFILE_STARTUP.lower() == "cprofile":
+    import cProfile
+    _STARTUP_PROFILER = cProfile.Profile()
+    _STARTUP_PROFILER.enable()
+
+import json
+import socket
+import threading
+import zlib
+from collections import deque
+from pathlib import Path
+
 # NEW: helpers for PyInstaller / resource location
 def is_frozen():
     """Return True when running from a PyInstaller bundle (onefile or onedir)."""
@@ -58,12 +65,255 @@ def _get_app_data_dir():
         except Exception:
             return Path(os.getcwd())
 
+# ------------------------ Single instance ------------------------
+# Set up before the heavy imports below, so a second launch can hand its
+# request to the running window and exit within a few milliseconds.
+
+INSTANCE_PROTOCOL = "hrt-tracker/1"
+
+
+def parse_launch_args(argv):
+    """
+    Launch options that can be handed to a running instance:
+      --page NAME     open a page (e.g. --page History)
+      --quick-log     open HRT Log ready for a new entry
+      --new-instance  start a separate window instead of handing off
+    Other arguments (e.g. --profile-startup) are ignored here.
+    """
+    request = {"page": None, "quick_log": False, "new_instance": False}
+    args = list(argv)
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--page" and i + 1 < len(args):
+            request["page"] = args[i + 1]
+            i += 1
+        elif arg.startswith("--page="):
+            request["page"] = arg.partition("=")[2]
+        elif arg == "--quick-log":
+            request["quick_log"] = True
+        elif arg == "--new-instance":
+            request["new_instance"] = True
+        i += 1
+    return request
+
+
+class InstanceServer:
+    """
+    Single-instance lock plus a local socket for launch requests.
+
+    The first instance binds a socket for the data folder (a Unix socket
+    file inside it, or on Windows a localhost port derived from its path);
+    the bind itself is the lock, so two launches cannot both win. Later
+    launches connect, send their request as one JSON line and exit once it
+    is acknowledged. A daemon thread acknowledges and queues requests; the
+    Tk thread takes them with poll(). On POSIX the thread also writes a
+    byte to a pipe whose read end (wake_fd) the app registers with Tk, so
+    the event loop only wakes when a request actually arrives.
+    """
+
+    SOCKET_NAME = "hrt_instance.sock"
+
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self.sock = None
+        self.requests = deque()
+        self.wake_fd = None
+        self._wake_w = None
+
+    def _address(self):
+        if hasattr(socket, "AF_UNIX") and os.name != "nt":
+            path = str(self.data_dir / self.SOCKET_NAME)
+            # sun_path is limited to about 100 bytes
+            if len(path.encode("utf-8")) < 100:
+                return socket.AF_UNIX, path
+        port = 49152 + zlib.crc32(str(self.data_dir).lower().encode("utf-8")) % 16000
+        return socket.AF_INET, ("127.0.0.1", port)
+
+    def claim(self, request):
+        """
+        Become the running instance or hand request to the existing one.
+        Returns "primary", "handed-off", or "standalone" when neither worked
+        (e.g. the port is taken by another program).
+        """
+        if self.listen():
+            return "primary"
+        if self.send(request):
+            return "handed-off"
+        family, address = self._address()
+        if family != socket.AF_INET and self._stale(family, address):
+            # left behind by an instance that crashed
+            try:
+                os.unlink(address)
+            except OSError:
+                pass
+            if self.listen():
+                return "primary"
+        return "standalone"
+
+    def listen(self):
+        family, address = self._address()
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            if os.name == "nt":
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            sock.bind(address)
+            sock.listen(8)
+        except OSError:
+            sock.close()
+            return False
+        self.sock = sock
+        if os.name != "nt":
+            try:
+                self.wake_fd, self._wake_w = os.pipe()
+                os.set_blocking(self.wake_fd, False)
+            except OSError:
+                self.wake_fd = self._wake_w = None
+        threading.Thread(target=self._serve, name="hrt-instance", daemon=True).start()
+        return True
+
+    @staticmethod
+    def _stale(family, address):
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(0.5)
+                sock.connect(address)
+            return False
+        except (ConnectionRefusedError, FileNotFoundError):
+            return True
+        except OSError:
+            return False
+
+    def send(self, request, timeout=1.0):
+        """Hand request to the running instance; True once it acknowledged."""
+        family, address = self._address()
+        message = dict(request, protocol=INSTANCE_PROTOCOL)
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(address)
+                sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+                reply = sock.makefile("r", encoding="utf-8").readline()
+            return json.loads(reply).get("ok") is True
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return  # closed
+            try:
+                with conn:
+                    conn.settimeout(2.0)
+                    request = json.loads(conn.makefile("r", encoding="utf-8").readline(65536))
+                    if isinstance(request, dict) and request.get("protocol") == INSTANCE_PROTOCOL:
+                        self.requests.append(request)
+                        conn.sendall(b'{"ok": true}\n')
+                        if self._wake_w is not None:
+                            os.write(self._wake_w, b"\0")
+            except (OSError, ValueError):
+                pass
+
+    def poll(self):
+        """Requests received since the last call (Tk thread)."""
+        if self.wake_fd is not None:
+            try:
+                while os.read(self.wake_fd, 4096):
+                    pass
+            except OSError:
+                pass
+        out = []
+        while self.requests:
+            out.append(self.requests.popleft())
+        return out
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            # shutdown wakes the accept() in the serving thread
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        family, address = self._address()
+        if family != socket.AF_INET:
+            try:
+                os.unlink(address)
+            except OSError:
+                pass
+        self.sock = None
+        for fd in (self.wake_fd, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.wake_fd = self._wake_w = None
+
+
+LAUNCH_REQUEST = parse_launch_args(sys.argv[1:] if __name__ == "__main__" else [])
+INSTANCE = None
+if __name__ == "__main__" and not LAUNCH_REQUEST["new_instance"] and not os.environ.get("HRT_MULTI_INSTANCE"):
+    INSTANCE = InstanceServer(_get_app_data_dir())
+    _claim = INSTANCE.claim(LAUNCH_REQUEST)
+    if _claim == "handed-off":
+        sys.exit(0)
+    if _claim != "primary":
+        INSTANCE = None
+_STARTUP_MARKS.append(("single instance", time.perf_counter_ns()))
+
+import customtkinter as ctk
+_STARTUP_MARKS.append(("import customtkinter", time.perf_counter_ns()))
+import shutil
+from datetime import datetime, date
+import tkinter
+from tkinter import messagebox
+import re
+import math
+from bisect import bisect_left, bisect_right, insort
+import heapq
+from contextlib import contextmanager
+import functools
+import mmap
+import hashlib
+import struct
+import uuid
+import logging
+import logging.handlers
+try:
+    import fcntl  # POSIX advisory file locks
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt  # Windows byte-range locks
+except ImportError:
+    msvcrt = None
+_STARTUP_MARKS.append(("import stdlib", time.perf_counter_ns()))
+import webbrowser
+from tkinter import filedialog
+_STARTUP_MARKS.append(("import webbrowser", time.perf_counter_ns()))
+import ctypes  # added for monitor detection
+from ctypes import Structure, c_long, c_ulong, byref  # added
+_STARTUP_MARKS.append(("import ctypes", time.perf_counter_ns()))
+import platform  # NEW: environment info for bug reports
+from urllib.parse import quote  # NEW: encode subject/body for Gmail compose links
+_STARTUP_MARKS.append(("import platform", time.perf_counter_ns()))
+import calendar  # NEW: calendar popup support
+_STARTUP_MARKS.append(("import calendar", time.perf_counter_ns()))
+
 # Remove the old duplicate imports and resource_base_path/config_path block.
 # Instead, keep a single, clear base dir reference for any non‑writable resources:
 BASE_DIR = Path(resource_path("."))  # folder of exe (onedir) or script
 
 # Use per-user application data dir for JSON files (entries, settings, etc.)
 APP_DATA_DIR = _get_app_data_dir()
+_STARTUP_MARKS.append(("_get_app_data_dir", time.perf_counter_ns()))
 
 ctk.set_appearance_mode("System")
 ctk.set_default_color_theme("blue")
@@ -77,9 +327,127 @@ SETTINGS_FILE = str(APP_DATA_DIR / "hrt_settings.json")
 BUGS_FILE = str(APP_DATA_DIR / "hrt_bug_reports.json")
 CONTRIB_FILE = str(APP_DATA_DIR / "hrt_contributions.json")
 
+# cache for analysis reports, keyed by the entries file version
+ANALYSIS_CACHE_FILE = str(APP_DATA_DIR / "hrt_analysis_cache.json")
+
+# rotating log of slow UI handlers (written only while the watchdog is enabled)
+DIAGNOSTICS_LOG_FILE = str(APP_DATA_DIR / "hrt_diagnostics.log")
+
 # (optional) small helper for display in Help text
 APP_DATA_DIR_DISPLAY = str(APP_DATA_DIR)
 
+# ------------------------ Metrics ------------------------
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram (milliseconds).
+
+    Bucket bounds grow geometrically by 2**0.25 (about 19%) from 0.01 ms
+    to roughly a minute, so recording is one bisect and an increment and
+    percentiles are accurate to within a bucket width.
+    """
+
+    BOUNDS = [0.01 * 2 ** (i / 4.0) for i in range(92)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, ms):
+        self.counts[bisect_left(self.BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if self.min is None or ms < self.min:
+            self.min = ms
+        if self.max is None or ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100), interpolated inside the bucket."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.BOUNDS[i - 1] if i > 0 else 0.0
+                hi = self.BOUNDS[i] if i < len(self.BOUNDS) else self.max
+                value = lo + (hi - lo) * max(0.0, rank - seen) / c
+                return min(max(value, self.min), self.max)
+            seen += c
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "min_ms": round(self.min, 3) if self.min is not None else None,
+            "p50_ms": round(self.percentile(50), 3) if self.count else None,
+            "p95_ms": round(self.percentile(95), 3) if self.count else None,
+            "p99_ms": round(self.percentile(99), 3) if self.count else None,
+            "max_ms": round(self.max, 3) if self.max is not None else None,
+        }
+
+
+class MetricsRegistry:
+    """In-process counters and latency histograms; recording is a no-op while disabled."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+
+    def incr(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, ms):
+        if self.enabled:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = LatencyHistogram()
+            h.record(ms)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "taken": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "counters": dict(sorted(self.counters.items())),
+            "latency": {k: h.summary() for k, h in sorted(self.histograms.items())},
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+# enabled from settings by the app; HRT_METRICS=1 also covers module-level loads
+METRICS = MetricsRegistry(enabled=bool(os.environ.get("HRT_METRICS")))
+
+
+def timed(name):
+    """Decorator recording a call's latency under name while METRICS is enabled."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.observe(name, (time.perf_counter() - t0) * 1000.0)
+        return wrapper
+    return decorate
+
+
 # ------------------------ Utilities ------------------------
 
 def _safe_int(value, default, min_val=None, max_val=None):
@@ -95,12 +463,178 @@ def _safe_int(value, default, min_val=None, max_val=None):
         return default
 
 
+class FileLockTimeout(OSError):
+    """Raised by FileLock.hold() when another process keeps the lock past the timeout."""
+
+
+class FileLock:
+    """
+    Advisory lock on "<path>.lock" shared by every process using the data
+    folder (the Beta and Mini builds resolve the same one). Writers take it
+    exclusively for the whole read-modify-write cycle; plain readers take it
+    shared. Uses fcntl.flock on POSIX and msvcrt.locking on Windows (always
+    exclusive there); without either, only threads of this process are
+    serialized.
+
+    Within a process the lock is re-entrant: nested holds (e.g. save_json
+    inside EntryStore.append) reuse the outer one. Waits are bounded; when
+    one times out, the pid the exclusive holder wrote into the lock file is
+    reported. The lock file is never removed: flock and msvcrt locks go
+    away with the process that held them, so a crash cannot leave one
+    behind, and unlinking could split holders across two files.
+    """
+
+    TIMEOUT = 5.0
+    _registry = {}
+    _registry_guard = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path):
+        key = os.path.abspath(path)
+        with cls._registry_guard:
+            lock = cls._registry.get(key)
+            if lock is None:
+                lock = cls._registry[key] = cls(key)
+            return lock
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._thread_lock = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def _close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def _try_os_lock(self, exclusive):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _os_unlock(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+
+    def holder(self):
+        """pid written by the last exclusive holder, or None."""
+        try:
+            with open(self.lock_path, "r", encoding="ascii") as f:
+                return int(f.read(32).split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _record_holder(self):
+        try:
+            os.ftruncate(self._fd, 0)
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, f"{os.getpid()} {time.time():.0f}\n".encode("ascii"))
+        except OSError:
+            pass
+
+    def _clear_holder(self):
+        try:
+            os.ftruncate(self._fd, 0)
+        except OSError:
+            pass
+
+    def _wait(self, exclusive, timeout):
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            if self._try_os_lock(exclusive):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def acquire(self, exclusive=True, timeout=None):
+        """Take the lock; returns False if it could not be had within timeout seconds."""
+        timeout = self.TIMEOUT if timeout is None else timeout
+        if not self._thread_lock.acquire(timeout=timeout):
+            return False
+        try:
+            if self._depth == 0:
+                self._open()
+                if not self._wait(exclusive, timeout):
+                    self._close()
+                    self._thread_lock.release()
+                    return False
+                self._exclusive = exclusive
+            elif exclusive and not self._exclusive:
+                # upgrade a shared hold taken further up this thread's stack
+                if not self._wait(True, timeout):
+                    self._thread_lock.release()
+                    return False
+                self._exclusive = True
+            if exclusive:
+                self._record_holder()
+            self._depth += 1
+            return True
+        except OSError:
+            self._close()
+            self._thread_lock.release()
+            return False
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if self._exclusive:
+                # still held here, so no other process is reading the pid
+                self._clear_holder()
+            self._os_unlock()
+            self._close()
+            self._exclusive = False
+        self._thread_lock.release()
+
+    @contextmanager
+    def hold(self, exclusive=True, timeout=None):
+        if not self.acquire(exclusive, timeout):
+            pid = self.holder()
+            raise FileLockTimeout(
+                f"{os.path.basename(self.path)} is in use by another HRT Tracker process"
+                + (f" (pid {pid})" if pid else "")
+            )
+        try:
+            yield self
+        finally:
+            self.release()
+
+
+@timed("load_json")
 def load_json(path, default):
     if not os.path.exists(path):
         return default
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with FileLock.for_path(path).hold(exclusive=False), open(path, "r", encoding="utf-8") as f:
+            st = os.fstat(f.fileno())
+            text = f.read()
+        data = json.loads(text)
+        # lets save_json skip rewriting the same content (see _PERSISTED)
+        _PERSISTED[os.path.abspath(path)] = (_content_digest(text), (st.st_size, st.st_mtime_ns))
         if not isinstance(data, type(default)):
             try:
                 os.replace(path, path + ".bak")
@@ -118,25 +652,169 @@ def load_json(path, default):
         return default
 
 
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """
+    Yield the elements of a top-level JSON array one at a time, reading the
+    file in chunks instead of parsing it all at once. Raises ValueError if
+    the file is not a well-formed JSON array.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                pos = _JSON_WS.match(buf, pos).end()
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "[":
+            raise ValueError("expected a JSON array")
+        pos += 1
+        skip_ws()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if not eof and (end == len(buf) or (
+                    isinstance(value, (int, float)) and buf[end] in "0123456789.eE+-")):
+                # a number may continue in the next chunk
+                fill()
+                continue
+            pos = end
+            yield value
+            skip_ws()
+            if pos >= len(buf):
+                raise ValueError("unterminated JSON array")
+            ch = buf[pos]
+            pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"unexpected {ch!r} in JSON array")
+            skip_ws()
+
+
+def read_json_array_tail(path, count, block_size=1 << 16, max_bytes=1 << 22):
+    """
+    Return the last count objects of a JSON array written by save_json
+    (indent=2) without parsing the rest of the file. Top-level objects start
+    on a line indented by exactly two spaces; raw newlines cannot occur
+    inside JSON strings, so that marker is unambiguous. Returns None when
+    the file does not have that layout.
+    """
+    decoder = json.JSONDecoder()
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            size = f.tell()
+            buf = b""
+            starts = []
+            while len(starts) < count and len(buf) < size and len(buf) < max_bytes:
+                step = min(block_size, size - len(buf))
+                f.seek(size - len(buf) - step)
+                buf = f.read(step) + buf
+                starts = [m.start() + 1 for m in re.finditer(rb"\n  \{", buf)]
+    except OSError:
+        return None
+    if not starts:
+        return None
+    text = buf[starts[-count:][0]:].decode("utf-8", errors="strict")
+    out = []
+    pos = 0
+    try:
+        while True:
+            pos = _JSON_WS.match(text, pos).end()
+            value, pos = decoder.raw_decode(text, pos)
+            out.append(value)
+            pos = _JSON_WS.match(text, pos).end()
+            if text[pos] == "]":
+                break
+            if text[pos] != ",":
+                return None
+            pos += 1
+    except (ValueError, IndexError):
+        return None
+    return out
+
+
+# path -> signature of the last file this process wrote, so DataFileWatcher
+# can tell its own saves from changes made by other programs
+_OWN_WRITES = {}
+
+# path -> (content digest, signature) of the file as this process last read
+# or wrote it; save_json skips a write whose content would be identical
+_PERSISTED = {}
+# save_json outcomes, shown on the Diagnostics page
+WRITE_STATS = {"written": 0, "skipped": 0}
+
+
+def _content_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+@timed("save_json")
 def save_json(path, data):
+    tmp = f"{path}.tmp"
+    key = os.path.abspath(path)
     try:
-        tmp = f"{path}.tmp"
+        text = json.dumps(data, indent=2, ensure_ascii=False, default=_json_default)
+        digest = _content_digest(text)
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            f.flush()
-            os.fsync(f.fileno())
-        try:
-            settings = load_settings()
-            if settings.get("backup_on_save", False) and os.path.exists(path):
-                backup = f"{path}.bak"
-                try:
-                    shutil.copy2(path, backup)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        os.replace(tmp, path)
+        with FileLock.for_path(path).hold():
+            last = _PERSISTED.get(key)
+            if last is not None and last[0] == digest and last[1] == _file_signature(path):
+                # same bytes as the untouched file on disk: no rewrite, fsync or backup
+                WRITE_STATS["skipped"] += 1
+                METRICS.incr("save_json.skipped")
+                return True
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                settings = load_settings()
+                if settings.get("backup_on_save", False) and os.path.exists(path):
+                    backup = f"{path}.bak"
+                    try:
+                        shutil.copy2(path, backup)
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+            os.replace(tmp, path)
+            sig = _file_signature(path)
+            _OWN_WRITES[key] = sig
+            _PERSISTED[key] = (digest, sig)
+            WRITE_STATS["written"] += 1
+        return True
     except Exception as e:
         try:
             if os.path.exists(tmp):
@@ -147,6 +825,7 @@ def save_json(path, data):
             messagebox.showerror("Save error", f"Failed to save {os.path.basename(path)}:\n{e}")
         except Exception:
             pass
+        return False
 
 
 def load_entries():
@@ -156,7 +835,7 @@ def load_entries():
 def save_entries(entries):
     if not isinstance(entries, list):
         entries = []
-    save_json(DATA_FILE, entries)
+    return save_json(DATA_FILE, entries)
 
 
 def load_resources():
@@ -198,7 +877,8 @@ def load_settings():
         "window_size": "1400x800",  # widened default
         "default_unit": "",
         "default_route": "",
-        "note_font_size": 12
+        "note_font_size": 12,
+        "concentrations": {}
     })
 
     if not isinstance(s, dict):
@@ -213,6 +893,10 @@ def load_settings():
     s.setdefault("window_size", "1400x800")
     s.setdefault("default_unit", "")
     s.setdefault("default_route", "")
+    s.setdefault("prewarm_pages", True)
+    s.setdefault("diagnostics_watchdog", False)
+    s.setdefault("watchdog_threshold_ms", 200)
+    s.setdefault("diagnostics_metrics", False)
 
     if "regimens" not in s or not isinstance(s["regimens"], list):
         s["regimens"] = DEFAULT_REGIMEN_SUGGESTIONS.copy()
@@ -220,6 +904,8 @@ def load_settings():
         s["routes"] = DEFAULT_ROUTE_OPTIONS.copy()
     if "units" not in s or not isinstance(s["units"], list):
         s["units"] = DEFAULT_DOSE_UNITS.copy()
+    if not isinstance(s.get("concentrations"), dict):
+        s["concentrations"] = {}
 
     s["note_font_size"] = _safe_int(s.get("note_font_size", 12), 12, 8, 32)
 
@@ -288,37 +974,2394 @@ def _get_monitor_top_left_for_pointer():
         return 0, 0
 
 
-# NEW: load/save helpers for bug reports & contributions
-def load_bug_reports():
-    return load_json(BUGS_FILE, [])
+# NEW: load/save helpers for bug reports & contributions
+def load_bug_reports():
+    return load_json(BUGS_FILE, [])
+
+def save_bug_reports(reports):
+    if not isinstance(reports, list):
+        reports = []
+    save_json(BUGS_FILE, reports)
+
+def load_contributions():
+    return load_json(CONTRIB_FILE, [])
+
+def save_contributions(contribs):
+    if not isinstance(contribs, list):
+        contribs = []
+    save_json(CONTRIB_FILE, contribs)
+
+
+# ------------------------ Startup timing ------------------------
+
+class StartupTimer:
+    """
+    Lightweight startup phase recorder based on perf_counter_ns.
+    Phases are contiguous: each one runs from the end of the previous one
+    to its mark() call, so the report adds up to the total startup time.
+    Recording is always on (it is a list append); the report is only
+    written when profiling was requested.
+    """
+
+    def __init__(self, marks, enabled=False, profiler=None):
+        self.origin = marks[0][1]
+        self.phases = []
+        self._last = self.origin
+        self.enabled = enabled
+        self.profiler = profiler
+        for name, end in marks[1:]:
+            self._add(name, end)
+
+    def _add(self, name, end):
+        self.phases.append((name, self._last, end))
+        self._last = end
+
+    def mark(self, name):
+        self._add(name, time.perf_counter_ns())
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block as its own phase (anything since the last mark becomes "(other)")."""
+        start = time.perf_counter_ns()
+        if start - self._last > 0:
+            self._add("(other)", start)
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def report(self):
+        to_ms = 1e-6
+        return {
+            "build": BUILD_NAME,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total_ms": (self._last - self.origin) * to_ms,
+            "phases": [
+                {"name": n, "start_ms": (a - self.origin) * to_ms, "duration_ms": (b - a) * to_ms}
+                for n, a, b in self.phases
+            ],
+            # Chrome trace / Perfetto format (open the file in ui.perfetto.dev)
+            "traceEvents": [
+                {"name": n, "ph": "X", "pid": 1, "tid": 1, "ts": (a - self.origin) / 1000, "dur": (b - a) / 1000}
+                for n, a, b in self.phases
+            ],
+        }
+
+    def write(self):
+        """Write startup_profile-<build>.json (and .prof when cProfile ran) to APP_DATA_DIR."""
+        if not self.enabled:
+            return None
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", BUILD_NAME).strip("-").lower() or "app"
+        path = APP_DATA_DIR / f"startup_profile-{slug}.json"
+        if self.profiler is not None:
+            try:
+                self.profiler.disable()
+                self.profiler.dump_stats(str(APP_DATA_DIR / f"startup_profile-{slug}.prof"))
+            except Exception:
+                pass
+            self.profiler = None
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=2)
+        except Exception:
+            return None
+        return path
+
+
+# which build is running (e.g. "HRT Tracker Beta" / "HRT Tracker Mini"); used in reports
+BUILD_NAME = Path(sys.executable if is_frozen() else os.path.abspath(__file__)).parent.name
+
+STARTUP = StartupTimer(_STARTUP_MARKS, enabled=bool(_PROFILE_STARTUP), profiler=_STARTUP_PROFILER)
+
+
+# ------------------------ Event-loop watchdog ------------------------
+
+class LagMonitor:
+    """
+    Opt-in watchdog for the Tk event loop.
+
+    A heartbeat is scheduled every INTERVAL_MS with after(); how late it
+    fires is the time the loop was blocked. Handlers decorated with
+    @watched report their duration as they finish, so a late heartbeat is
+    attributed to the slowest handlers that ran since the previous beat.
+    Slow handlers and lag spikes above threshold_ms are kept in memory
+    (for the Diagnostics page) and appended to a rotating log file.
+    """
+
+    INTERVAL_MS = 100
+
+    def __init__(self, root, threshold_ms=200, log_path=None, max_records=200):
+        self.root = root
+        self.threshold_ms = threshold_ms
+        self.records = deque(maxlen=max_records)
+        self.max_lag_ms = 0.0
+        self._since_beat = []
+        self._expected = None
+        self._after_id = None
+        self._logger = None
+        if log_path:
+            try:
+                self._logger = logging.getLogger("hrt.watchdog")
+                self._logger.setLevel(logging.INFO)
+                self._logger.propagate = False
+                if not self._logger.handlers:
+                    handler = logging.handlers.RotatingFileHandler(
+                        log_path, maxBytes=256 * 1024, backupCount=3, encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                    self._logger.addHandler(handler)
+            except Exception:
+                self._logger = None
+
+    def start(self):
+        if self._after_id is None:
+            self._schedule()
+
+    def stop(self):
+        try:
+            if self._after_id is not None:
+                self.root.after_cancel(self._after_id)
+        except Exception:
+            pass
+        self._after_id = None
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.INTERVAL_MS / 1000.0
+        self._after_id = self.root.after(self.INTERVAL_MS, self._beat)
+
+    def _beat(self):
+        lag_ms = (time.perf_counter() - self._expected) * 1000.0
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms > self.threshold_ms:
+            culprits = sorted(self._since_beat, key=lambda h: -h[1])[:3]
+            names = ", ".join(f"{n} ({ms:.0f} ms)" for n, ms in culprits) or "(no tracked handler)"
+            self._record("event loop lag", lag_ms, names)
+        self._since_beat = []
+        try:
+            self._schedule()
+        except Exception:
+            self._after_id = None
+
+    def handler_finished(self, name, duration_ms):
+        self._since_beat.append((name, duration_ms))
+        if duration_ms > self.threshold_ms:
+            self._record("slow handler", duration_ms, name)
+
+    def _record(self, kind, duration_ms, command):
+        rec = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "kind": kind,
+            "command": command,
+            "duration_ms": round(duration_ms, 1),
+        }
+        self.records.append(rec)
+        if self._logger is not None:
+            try:
+                self._logger.info("%s %.1f ms: %s", kind, duration_ms, command)
+            except Exception:
+                pass
+
+
+# the active LagMonitor, or None when the watchdog is off
+WATCHDOG = None
+
+
+def watched(name):
+    """Decorator reporting a UI handler's duration to the watchdog (no-op when it is off)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if WATCHDOG is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                try:
+                    WATCHDOG.handler_finished(name, (time.perf_counter() - t0) * 1000.0)
+                except Exception:
+                    pass
+        return wrapper
+    return decorate
+
+
+# ------------------------ Scheduling ------------------------
+
+class AlignedTicker:
+    """
+    Calls callback() on wall-clock boundaries (every whole second, minute,
+    ...) while started. Each tick schedules exactly one after() to the next
+    boundary, so a stopped ticker costs nothing and a running one wakes
+    the event loop only when the display actually changes.
+    """
+
+    # land slightly after the boundary so the new second/minute is already current
+    SLACK_MS = 5
+
+    def __init__(self, widget, callback, period=1.0):
+        self.widget = widget
+        self.callback = callback
+        self.period = period
+        self._after_id = None
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    def start(self):
+        """Tick now and keep ticking; no-op if already running."""
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def set_period(self, period):
+        if period != self.period:
+            self.period = period
+            if self.running:
+                self.stop()
+                self.start()
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            self.callback()
+        except Exception:
+            pass
+        delay = self.period - (time.time() % self.period)
+        try:
+            self._after_id = self.widget.after(int(delay * 1000) + self.SLACK_MS, self._tick)
+        except Exception:
+            self._after_id = None
+
+
+class _ChunkedTask:
+    __slots__ = ("steps", "key", "on_done", "cancelled")
+
+    def __init__(self, steps, key, on_done):
+        self.steps = steps
+        self.key = key
+        self.on_done = on_done
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class ChunkedTaskRunner:
+    """
+    Cooperative scheduler for long widget work on the Tk thread.
+
+    A task is an iterator (usually a generator) where each step does a small
+    piece of work, e.g. creating one row. The runner executes steps for at
+    most budget_ms, then returns to the event loop and continues with
+    after(1), so input and redraws are handled between slices. Lower
+    priority numbers run first (ties in submission order). Submitting with
+    a key cancels the unfinished task with the same key, so a newer render
+    replaces an older one.
+    """
+
+    PRIORITY_VISIBLE = 0
+    PRIORITY_BACKGROUND = 10
+
+    def __init__(self, root, budget_ms=8):
+        self.root = root
+        self.budget = budget_ms / 1000.0
+        self._heap = []
+        self._keys = {}
+        self._seq = 0
+        self._after_id = None
+
+    def submit(self, steps, priority=0, key=None, on_done=None):
+        if key is not None:
+            self.cancel(key)
+        task = _ChunkedTask(iter(steps), key, on_done)
+        heapq.heappush(self._heap, (priority, self._seq, task))
+        self._seq += 1
+        if key is not None:
+            self._keys[key] = task
+        self._schedule(idle=True)
+        return task
+
+    def cancel(self, key):
+        task = self._keys.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def pending(self, key):
+        return key in self._keys
+
+    def busy(self):
+        """True while any submitted task still has steps left to run."""
+        return any(not task.cancelled for _, _, task in self._heap)
+
+    def _schedule(self, idle=False):
+        if self._after_id is not None:
+            return
+        try:
+            self._after_id = self.root.after_idle(self._run) if idle else self.root.after(1, self._run)
+        except Exception:
+            self._after_id = None
+
+    def _finish(self, task):
+        heapq.heappop(self._heap)
+        if task.key is not None and self._keys.get(task.key) is task:
+            del self._keys[task.key]
+        if task.on_done is not None and not task.cancelled:
+            try:
+                task.on_done()
+            except Exception:
+                pass
+
+    def _run(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.budget
+        while self._heap:
+            task = self._heap[0][2]
+            if task.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            try:
+                next(task.steps)
+            except StopIteration:
+                self._finish(task)
+            except Exception:
+                # a failing task is dropped; the rest keep running
+                task.cancelled = True
+                self._finish(task)
+            if time.perf_counter() >= deadline:
+                break
+        if self._heap:
+            self._schedule()
+
+
+# ------------------------ Invalidation bus ------------------------
+
+class InvalidationBus:
+    """
+    Minimal publish/subscribe hub for data changes. Stores publish a topic
+    ("entries", "settings", "resources") after they change; pages subscribe
+    to the topics they display and mark themselves dirty (see BasePage).
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def subscribe(self, topic, callback):
+        self._subscribers.setdefault(topic, []).append(callback)
+
+    def publish(self, topic):
+        for callback in list(self._subscribers.get(topic, ())):
+            try:
+                callback(topic)
+            except Exception:
+                pass
+
+
+# ------------------------ File watching ------------------------
+
+class DataFileWatcher:
+    """
+    Notices changes other programs make to the data files (another app
+    instance, a sync tool, restoring a .bak) and calls handlers[path](path)
+    on the Tk thread, after a short debounce so a burst of writes becomes
+    one call.
+
+    On Linux the data folder is watched with inotify (through ctypes) and
+    the descriptor is registered with Tk's own event loop, so nothing runs
+    until the kernel reports a change. Elsewhere, or if inotify is not
+    available, the files are stat()ed every POLL_MS. Saves made by this
+    process (see _OWN_WRITES) are ignored.
+    """
+
+    DEBOUNCE_MS = 150
+    POLL_MS = 2000
+
+    # <sys/inotify.h>
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, widget, handlers):
+        self.widget = widget
+        self.handlers = {os.path.abspath(p): cb for p, cb in handlers.items()}
+        self._by_name = {os.path.basename(p): p for p in self.handlers}
+        self._known = {p: _file_signature(p) for p in self.handlers}
+        self._pending = set()
+        self._debounce_id = None
+        self._poll_id = None
+        self._fd = None
+        self.mode = None
+
+    def start(self):
+        if self._start_inotify():
+            self.mode = "inotify"
+        else:
+            self.mode = "polling"
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+
+    def stop(self):
+        for after_id in (self._debounce_id, self._poll_id):
+            if after_id is not None:
+                try:
+                    self.widget.after_cancel(after_id)
+                except Exception:
+                    pass
+        self._debounce_id = self._poll_id = None
+        if self._fd is not None:
+            try:
+                self.widget.tk.deletefilehandler(self._fd)
+            except Exception:
+                pass
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+        self.mode = None
+
+    def _start_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return False
+        fd = -1
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                return False
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_MOVED_FROM | self.IN_CREATE | self.IN_DELETE
+            # watch the folders, not the files: saves replace the file (new inode)
+            for folder in {os.path.dirname(p) for p in self.handlers}:
+                if libc.inotify_add_watch(fd, os.fsencode(folder), mask) < 0:
+                    raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            self.widget.tk.createfilehandler(fd, tkinter.READABLE, self._on_readable)
+            self._fd = fd
+            return True
+        except Exception:
+            if fd >= 0:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            return False
+
+    def _on_readable(self, fd, mask):
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            # descriptor broke; carry on with polling
+            self.stop()
+            self.mode = "polling"
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+            return
+        pos = 0
+        while pos + self._EVENT.size <= len(data):
+            _, _, _, name_len = self._EVENT.unpack_from(data, pos)
+            pos += self._EVENT.size
+            name = data[pos:pos + name_len].rstrip(b"\0").decode("utf-8", "replace")
+            pos += name_len
+            path = self._by_name.get(name)
+            if path is not None:
+                self._check(path)
+
+    def _poll(self):
+        self._poll_id = None
+        for path in self.handlers:
+            self._check(path)
+        try:
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+        except Exception:
+            pass
+
+    def _check(self, path):
+        sig = _file_signature(path)
+        if sig == self._known.get(path):
+            return
+        self._known[path] = sig
+        if sig is not None and sig == _OWN_WRITES.get(path):
+            return
+        self._pending.add(path)
+        if self._debounce_id is None:
+            try:
+                self._debounce_id = self.widget.after(self.DEBOUNCE_MS, self._flush)
+            except Exception:
+                pass
+
+    def _flush(self):
+        self._debounce_id = None
+        pending, self._pending = self._pending, set()
+        for path in pending:
+            try:
+                self.handlers[path](path)
+            except Exception:
+                pass
+
+
+# ------------------------ Entry model ------------------------
+
+_MISSING = object()
+
+
+class _SlotRecord:
+    """
+    Dict-like record stored in __slots__ instead of a per-object dict.
+
+    Known keys live in slots (absent ones hold _MISSING, so "key in record"
+    behaves like a dict); unknown keys go to a small overflow dict that is
+    only allocated when needed. Values of the INTERNED fields (names,
+    routes, units, moods) are interned, so the thousands of repeats across
+    entries share one string object. Keys keep their insertion order like a
+    dict's (new keys such as a late "id" go last), so saving does not
+    reorder entries read from disk; the order tuples are shared between
+    records with the same layout. Convert with to_dict() at the JSON
+    boundary; save_json does this through _json_default.
+    """
+
+    __slots__ = ("_extra", "_order")
+    FIELDS = ()
+    INTERNED = frozenset()
+    # key order tuple -> the one shared instance of it
+    _ORDERS = {}
+
+    def __init__(self, data=()):
+        for name in self.FIELDS:
+            setattr(self, name, _MISSING)
+        self._extra = None
+        pairs = data.items() if hasattr(data, "items") else data
+        order = []
+        for key, value in pairs:
+            self._store(key, value)
+            order.append(key)
+        if not hasattr(data, "items"):
+            order = dict.fromkeys(order)
+        self._order = self._shared_order(tuple(order))
+
+    @classmethod
+    def _shared_order(cls, order):
+        return cls._ORDERS.setdefault(order, order)
+
+    def _convert(self, key, value):
+        if key in self.INTERNED and type(value) is str:
+            return sys.intern(value)
+        return value
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._order = self._shared_order(self._order + (key,))
+        self._store(key, value)
+
+    def _store(self, key, value):
+        value = self._convert(key, value)
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS and getattr(self, key) is not _MISSING:
+            setattr(self, key, _MISSING)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+        self._order = self._shared_order(tuple(k for k in self._order if k != key))
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def keys(self):
+        return list(self._order)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def update(self, other=(), **kwargs):
+        for key, value in (other.items() if hasattr(other, "items") else other):
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def copy(self):
+        return type(self)(self.to_dict())
+
+    def to_dict(self):
+        return {k: self[k] for k in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, _SlotRecord)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        # same text as the dict it replaces, so search over str() is unchanged
+        return repr(self.to_dict())
+
+
+class MedRecord(_SlotRecord):
+    __slots__ = ("name", "dose", "unit", "route", "time", "canonical_dose", "canonical_unit")
+    FIELDS = __slots__
+    INTERNED = frozenset(("name", "dose", "unit", "route", "canonical_unit"))
+
+
+class EntryRecord(_SlotRecord):
+    __slots__ = ("id", "timestamp", "title", "regimen", "route", "dose", "mood", "symptoms", "notes", "medications")
+    FIELDS = __slots__
+    INTERNED = frozenset(("title", "regimen", "route", "dose", "mood"))
+
+    def _convert(self, key, value):
+        if key == "medications" and isinstance(value, list):
+            return [MedRecord(m) if isinstance(m, (dict, _SlotRecord)) else m for m in value]
+        return _SlotRecord._convert(self, key, value)
+
+
+# isinstance() checks in entry code accept plain dicts and the compact records
+RECORD_TYPES = (dict, _SlotRecord)
+
+
+def as_entry_record(entry):
+    """Compact form of a JSON entry dict; other values are returned unchanged."""
+    if isinstance(entry, dict):
+        return EntryRecord(entry)
+    return entry
+
+
+def new_entry_id():
+    return uuid.uuid4().hex[:16]
+
+
+def ensure_entry_id(entry):
+    """Give an entry a stable "id" if it has none (older files); returns the id."""
+    entry_id = entry.get("id")
+    if not entry_id:
+        entry_id = entry["id"] = new_entry_id()
+    return entry_id
+
+
+def _json_default(obj):
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+# ------------------------ Entry store ------------------------
+
+class EntryOffsetIndex:
+    """
+    Sidecar index of the entries file: the byte range of every top-level
+    entry and entry id -> position, so one record can be read with a seek
+    into an mmap instead of parsing the whole file.
+
+    Built by scanning bytes rather than parsing JSON: in the indent=2 layout
+    save_json writes, entries are the only objects opened by a line
+    starting with two spaces and "{", closed by two spaces and "}", and
+    their "id" sits on a line indented by four. The sidecar stores a
+    fingerprint of the data file (size, mtime and a CRC32 of its first and
+    last 64 KB; a full checksum would cost as much as parsing) and is
+    rebuilt whenever that fingerprint changes.
+    """
+
+    VERSION = 1
+    _START = b"\n  {"
+    _END = b"\n  }"
+    _ID = b'\n    "id": "'
+
+    def __init__(self, data_path, index_path=None):
+        self.data_path = data_path
+        self.index_path = index_path or os.path.splitext(data_path)[0] + ".idx.json"
+        self.fingerprint = None
+        self.ranges = []
+        self.ids = {}
+        self.usable = False
+
+    def _fingerprint(self):
+        try:
+            with open(self.data_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                head = f.read(1 << 16)
+                f.seek(max(0, st.st_size - (1 << 16)))
+                tail = f.read(1 << 16)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns, zlib.crc32(head + tail)]
+
+    def ensure(self):
+        """Make the index match the data file, loading or rebuilding the sidecar. Returns usable."""
+        fp = self._fingerprint()
+        if fp is None:
+            self.fingerprint, self.ranges, self.ids, self.usable = None, [], {}, False
+            return False
+        if fp == self.fingerprint:
+            return self.usable
+        # a rebuildable cache: plain read (no lock file, no .bak on errors); rebuild on any problem
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION and data.get("fingerprint") == fp:
+                self.ranges = [tuple(r) for r in data.get("ranges", [])]
+                self.ids = dict(data.get("ids", {}))
+                self.usable = bool(data.get("usable"))
+                self.fingerprint = fp
+                return self.usable
+        except Exception:
+            pass
+        self.build(fp)
+        return self.usable
+
+    def build(self, fingerprint=None):
+        ranges, ids = [], {}
+        usable = False
+        try:
+            with open(self.data_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        pos = mm.find(self._START)
+                        while pos != -1:
+                            start = pos + 3
+                            if mm[start + 1:start + 2] == b"}":
+                                end = start + 2
+                            else:
+                                close = mm.find(self._END, start)
+                                if close == -1:
+                                    raise ValueError("unterminated entry")
+                                end = close + len(self._END)
+                            id_pos = mm.find(self._ID, start, end)
+                            if id_pos != -1:
+                                q = id_pos + len(self._ID)
+                                ids[mm[q:mm.find(b'"', q, end)].decode("utf-8")] = len(ranges)
+                            ranges.append((start, end))
+                            pos = mm.find(self._START, end)
+                        usable = bool(ranges) or mm[:].strip() == b"[]"
+                    finally:
+                        mm.close()
+        except (OSError, ValueError):
+            ranges, ids, usable = [], {}, False
+        self.ranges, self.ids, self.usable = ranges, ids, usable
+        self.fingerprint = fingerprint or self._fingerprint()
+        METRICS.incr("entry_index.build")
+        # written quietly (no save_json error dialog): this may run on the loader thread
+        tmp = f"{self.index_path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": self.VERSION,
+                    "fingerprint": self.fingerprint,
+                    "usable": usable,
+                    "ranges": ranges,
+                    "ids": ids,
+                }, f)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass
+
+    def read(self, position):
+        """Parse only the entry at position (file order); None if unavailable."""
+        if not self.usable or not 0 <= position < len(self.ranges):
+            return None
+        start, end = self.ranges[position]
+        try:
+            with open(self.data_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    raw = mm[start:end]
+                finally:
+                    mm.close()
+            return json.loads(raw.decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def read_id(self, entry_id):
+        position = self.ids.get(entry_id)
+        return None if position is None else self.read(position)
+
+
+class EntryLoader:
+    """
+    Parses the entries file on a worker thread. The newest PREVIEW_COUNT
+    entries are read from the end of the file up front so History can show
+    them right away; the Tk thread polls done and hands the full list to
+    the store via EntryStore.finish_background_load().
+    """
+
+    PREVIEW_COUNT = 50
+
+    def __init__(self, path, conc_index, signature):
+        self.path = path
+        self.conc_index = conc_index
+        self.signature = signature
+        self.preview = []
+        self.entries = None
+        self.count = 0
+        self.error = None
+        self.done = False
+        self._thread = None
+
+    def _record(self, entry):
+        entry = as_entry_record(entry)
+        normalize_entry(entry, self.conc_index, only_missing=True)
+        if isinstance(entry, RECORD_TYPES):
+            ensure_entry_id(entry)
+        return entry
+
+    def start(self):
+        try:
+            self.preview = [self._record(e) for e in read_json_array_tail(self.path, self.PREVIEW_COUNT) or []]
+        except Exception:
+            self.preview = []
+        self._thread = threading.Thread(target=self._run, name="hrt-entry-loader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        entries = []
+        try:
+            for e in iter_json_array(self.path):
+                entries.append(self._record(e))
+                self.count = len(entries)
+            self.entries = entries
+            # the file is warm in the page cache now; refresh the offset index too
+            EntryOffsetIndex(self.path).ensure()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+
+class EntryWAL:
+    """
+    Write-ahead log of EntryStore changes ("hrt_entries.wal").
+
+    Before the entries file is rewritten, the change is appended here as
+    one line "<crc32 hex> <json>" and fsynced; once os.replace has
+    committed the rewrite the log is cleared. So after a crash the log holds
+    only the changes that may be missing from the entries file, and startup
+    replays just those. Replay goes by entry id, so a change that did reach
+    the file is skipped rather than applied twice. A torn or corrupt line
+    ends the log: it was never acknowledged, so the file was not touched.
+    """
+
+    def __init__(self, data_path):
+        self.path = os.path.splitext(data_path)[0] + ".wal"
+
+    def pending(self):
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+    def log(self, records):
+        lines = []
+        for record in records:
+            payload = json.dumps(record, ensure_ascii=False, default=_json_default).encode("utf-8")
+            lines.append(b"%08x " % zlib.crc32(payload) + payload + b"\n")
+        with open(self.path, "ab") as f:
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        if self.pending():
+            with open(self.path, "wb"):
+                pass
+
+    def read(self):
+        """(records, torn): the valid records, and whether a damaged tail was dropped."""
+        records = []
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except OSError:
+            return records, False
+        # the last element is b"" when the log ends with a complete line
+        for line in lines[:-1]:
+            crc, _, payload = line.partition(b" ")
+            try:
+                if int(crc, 16) != zlib.crc32(payload):
+                    return records, True
+                records.append(json.loads(payload.decode("utf-8")))
+            except ValueError:
+                return records, True
+        return records, bool(lines[-1])
+
+    @staticmethod
+    def replay(entries, records, conc_index=None):
+        """
+        Apply logged changes to entries (a list of records) in place.
+        Returns (applied, skipped); skipped ones were already in the list.
+        """
+        positions = {e.get("id"): i for i, e in enumerate(entries) if isinstance(e, RECORD_TYPES) and e.get("id")}
+        removed = set()
+        applied = skipped = 0
+
+        def locate(record):
+            i = positions.get(record.get("id"))
+            if i is None and record.get("timestamp") is not None:
+                # saved before its id was written (ids of older entries are added on load)
+                i = find_entry_index(entries, record)
+            return None if i is None or i in removed else i
+
+        for record in records:
+            op = record.get("op")
+            entry = record.get("entry")
+            if op == "append" and isinstance(entry, dict):
+                if entry.get("id") in positions:
+                    skipped += 1
+                    continue
+                entry = as_entry_record(entry)
+                normalize_entry(entry, conc_index, only_missing=True)
+                positions[entry.get("id")] = len(entries)
+                entries.append(entry)
+                applied += 1
+            elif op == "delete":
+                i = locate(record)
+                if i is None:
+                    skipped += 1
+                    continue
+                removed.add(i)
+                applied += 1
+            elif op == "update" and isinstance(entry, dict):
+                i = locate(entry)
+                entry = as_entry_record(entry)
+                if i is None or entries[i] == entry:
+                    skipped += 1
+                    continue
+                entries[i] = entry
+                applied += 1
+        if removed:
+            entries[:] = [e for i, e in enumerate(entries) if i not in removed]
+        return applied, skipped
+
+
+class EntryStore:
+    """
+    Shared in-memory copy of the entries file.
+    Reloads automatically when the file changes on disk and caches derived
+    data (chart series, indexes, reports) until the entries change again.
+    """
+
+    def __init__(self, path=None, bus=None):
+        self.path = path or DATA_FILE
+        self.bus = bus
+        self._entries = None
+        self._signature = None
+        self._loader = None
+        self._offset_index = None
+        self._derived = {}
+        self.version = 0
+        # lower-cased medication name -> mg/ml, see concentration_index()
+        self.conc_index = {}
+        # medications whose concentration changed before their entries could
+        # be re-converted (see _renormalize_pending)
+        self._pending_renormalize = set()
+        self.wal = EntryWAL(self.path)
+        # what the last crash recovery did (see _recover); on_recovery(report) is told too
+        self.last_recovery = None
+        self.on_recovery = None
+        # names offered by autocomplete before they are logged (see set_medication_suggestions)
+        self.medication_suggestions = ()
+
+    def _disk_signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def data_key(self):
+        """
+        Stable identifier of the entries file contents (size + mtime) that is
+        valid across sessions; used to key caches persisted to disk.
+        """
+        sig = self._disk_signature()
+        return f"{sig[0]}:{sig[1]}" if sig else "missing"
+
+    def entries(self):
+        """Return the current entries list, reloading it if the file changed."""
+        if self._loader is not None:
+            # a background parse is under way; waiting for it beats parsing twice
+            self._loader.join()
+            self.finish_background_load()
+        if self._entries is None or self._disk_signature() != self._signature:
+            self.reload()
+        return self._entries
+
+    # files smaller than this are parsed directly; larger ones stream in the background
+    STREAM_MIN_BYTES = 1 << 20
+
+    def is_loaded(self):
+        return self._entries is not None and self._disk_signature() == self._signature
+
+    def load_in_background(self):
+        """
+        Start parsing the entries file on a worker thread and return the
+        EntryLoader (or the one already running). Returns None when the file
+        is small enough that entries() can simply load it.
+        """
+        if self._loader is not None:
+            return self._loader
+        sig = self._disk_signature()
+        if sig is None or sig[0] < self.STREAM_MIN_BYTES or self.wal.pending():
+            # crash recovery goes through reload()
+            return None
+        self._loader = EntryLoader(self.path, self.conc_index, sig)
+        self._loader.start()
+        return self._loader
+
+    def finish_background_load(self):
+        """
+        Install the entries of a finished background load. Returns False
+        while the loader is still parsing. Like reloads from entries(), this
+        does not publish; the page that started the load refreshes itself.
+        """
+        loader = self._loader
+        if loader is None:
+            return True
+        if not loader.done:
+            return False
+        self._loader = None
+        if loader.error is None and loader.signature == self._disk_signature():
+            self._entries = loader.entries
+            self._signature = loader.signature
+            self._bump()
+            METRICS.incr("store.stream_load")
+            self._renormalize_after_load()
+        else:
+            # changed meanwhile or malformed: the regular loader also handles .bak recovery
+            self.reload()
+        return True
+
+    def reload(self):
+        self._signature = self._disk_signature()
+        data, report = self._read_file()
+        if report is not None or self.wal.pending():
+            data = self._recover(data, report)
+        self._entries = [as_entry_record(e) for e in data]
+        # entries written before unit normalization existed get their canonical
+        # values once here, so analytics never convert per row
+        for e in self._entries:
+            normalize_entry(e, self.conc_index, only_missing=True)
+            # ids given to older entries here are written with the next save
+            if isinstance(e, RECORD_TYPES):
+                ensure_entry_id(e)
+        self._bump()
+        METRICS.incr("store.reload")
+        self._renormalize_after_load()
+
+    def _read_file(self):
+        """
+        (entries, report): the parsed entries file, or when it is missing or
+        damaged the best copy _salvage() can find, with a report of where it
+        came from. Never renames the file away or falls back to [] silently.
+        """
+        try:
+            # only the read is locked; parsing a large file must not hold
+            # writers off
+            with FileLock.for_path(self.path).hold(exclusive=False), open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+            data = json.loads(text)
+            if isinstance(data, list):
+                return data, None
+        except FileNotFoundError:
+            if not os.path.exists(self.path + ".tmp"):
+                return [], None
+        except (OSError, ValueError):
+            pass
+        return self._salvage()
+
+    def _salvage(self):
+        candidates = []
+        for source, path in (("temp file", self.path + ".tmp"), ("backup", self.path + ".bak")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    candidates.append((source, data))
+            except (OSError, ValueError):
+                pass
+        for source, path in (("readable part of the damaged file", self.path),
+                             ("readable part of the temp file", self.path + ".tmp")):
+            salvaged = []
+            try:
+                # complete entries before the point where the file is cut off
+                for e in iter_json_array(path):
+                    salvaged.append(e)
+            except (OSError, ValueError):
+                pass
+            candidates.append((source, salvaged))
+        if candidates[0][0] == "temp file":
+            # fully written and fsynced just before a crash cut off the os.replace
+            source, data = candidates[0]
+        else:
+            source, data = max(candidates, key=lambda c: len(c[1]))
+        damaged_copy = None
+        if os.path.exists(self.path):
+            damaged_copy = f"{self.path}.damaged-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            try:
+                shutil.copy2(self.path, damaged_copy)
+            except OSError:
+                damaged_copy = None
+        return data, {"source": source, "entries": len(data), "damaged_copy": damaged_copy}
+
+    def _recover(self, data, report):
+        """
+        Replay the write-ahead log over data and save the result, holding
+        the write lock. Returns the recovered entries; last_recovery and
+        on_recovery get a report unless the log only held committed changes.
+        """
+        try:
+            with self._writing():
+                if self._disk_signature() != self._signature:
+                    # another process saved (and cleared its log) meanwhile
+                    self._signature = self._disk_signature()
+                    data, report = self._read_file()
+                records, torn = self.wal.read()
+                entries = [as_entry_record(e) for e in data]
+                for e in entries:
+                    normalize_entry(e, self.conc_index, only_missing=True)
+                    if isinstance(e, RECORD_TYPES):
+                        ensure_entry_id(e)
+                applied, skipped = EntryWAL.replay(entries, records, self.conc_index)
+                if report is not None or applied:
+                    if not save_entries(entries):
+                        # keep the log for the next attempt
+                        return entries
+                    self._signature = self._disk_signature()
+                self.wal.clear()
+        except FileLockTimeout:
+            return data
+        if report is None and not applied and not torn:
+            return entries
+        report = dict(report or {"source": "entries file", "entries": len(data), "damaged_copy": None})
+        report.update(replayed=applied, already_saved=skipped, torn_tail=torn, total=len(entries))
+        self.last_recovery = report
+        METRICS.incr("store.recovery")
+        if self.on_recovery is not None:
+            try:
+                self.on_recovery(report)
+            except Exception:
+                pass
+        return entries
+
+    def _bump(self):
+        self.version += 1
+        self._derived.clear()
+
+    def _publish(self):
+        # only explicit mutations publish; reloads triggered from entries()
+        # happen while a page is already reading and must not re-enter it
+        if self.bus is not None:
+            self.bus.publish("entries")
+
+    def position_of(self, entry):
+        """Index of entry in entries(): by id through a cached map, else by (timestamp, regimen)."""
+        entries = self.entries()
+        entry_id = entry.get("id")
+        if entry_id:
+            position = self.derived(
+                "id_positions", lambda es: {e.get("id"): i for i, e in enumerate(es) if isinstance(e, RECORD_TYPES)}
+            ).get(entry_id)
+            if position is not None:
+                return position
+        return find_entry_index(entries, entry)
+
+    def offset_index(self):
+        """The EntryOffsetIndex for the data file, refreshed if the file changed."""
+        if self._offset_index is None:
+            self._offset_index = EntryOffsetIndex(self.path)
+        self._offset_index.ensure()
+        return self._offset_index
+
+    def read_entry(self, entry_id):
+        """
+        Current version of one entry by id. Served from memory when the store
+        is up to date; otherwise only that record is read from disk through
+        the offset index instead of reloading the whole file.
+        """
+        if self.is_loaded():
+            position = self.position_of({"id": entry_id})
+            return self._entries[position] if position is not None else None
+        try:
+            entry = self.offset_index().read_id(entry_id)
+        except Exception:
+            entry = None
+        if entry is None:
+            return None
+        entry = as_entry_record(entry)
+        normalize_entry(entry, self.conc_index, only_missing=True)
+        return entry
+
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive FileLock for a read-modify-write of the entries file. Inside
+        it, entries() picks up anything another process saved meanwhile, so
+        the following save cannot drop that process's changes.
+        """
+        with FileLock.for_path(self.path).hold():
+            self._renormalize_pending()
+            yield
+
+    @staticmethod
+    def _lock_failed(err):
+        try:
+            messagebox.showerror("Entries in use", f"{err}.\nPlease try again in a moment.")
+        except Exception:
+            pass
+        return False
+
+    def remove_at(self, index):
+        """Delete entries()[index] and save. Returns False if the write failed."""
+        entries = self.entries()
+        if not 0 <= index < len(entries):
+            return False
+        target = entries[index]
+        try:
+            with self._writing():
+                entries = self.entries()
+                if index >= len(entries) or entries[index] is not target:
+                    # reloaded with another process's changes; find the entry again
+                    index = self.position_of(target)
+                    if index is None:
+                        return False
+                self.wal.log([{
+                    "op": "delete", "id": target.get("id"),
+                    "timestamp": target.get("timestamp"), "regimen": target.get("regimen"),
+                }])
+                del entries[index]
+                if not save_entries(entries):
+                    self.wal.clear()
+                    self.reload()
+                    return False
+                self._signature = self._disk_signature()
+                self.wal.clear()
+        except FileLockTimeout as e:
+            return self._lock_failed(e)
+        self._bump()
+        self._publish()
+        return True
+
+    def append(self, entry):
+        """
+        Append one entry and save the file. Derived values that know how to
+        absorb an append (an apply_append(entry) method returning True) are
+        kept; everything else is rebuilt on next use. Returns False if the
+        file could not be written, in which case the store is reloaded.
+        """
+        entry = as_entry_record(entry)
+        normalize_entry(entry, self.conc_index, only_missing=True)
+        ensure_entry_id(entry)
+        try:
+            with self._writing():
+                entries = self.entries()
+                self.wal.log([{"op": "append", "entry": entry}])
+                entries.append(entry)
+                if not save_entries(entries):
+                    self.wal.clear()
+                    self.reload()
+                    return False
+                self._signature = self._disk_signature()
+                self.wal.clear()
+        except FileLockTimeout as e:
+            return self._lock_failed(e)
+        self.version += 1
+        self._apply_appends([entry])
+        METRICS.incr("store.append")
+        self._publish()
+        return True
+
+    def _apply_appends(self, appended):
+        """Keep the derived values that absorb these appends; drop the rest."""
+        kept = {}
+        for name, value in self._derived.items():
+            apply_append = getattr(value, "apply_append", None)
+            try:
+                if apply_append is not None and all(apply_append(e) for e in appended):
+                    kept[name] = value
+            except Exception:
+                pass
+        self._derived = kept
+        METRICS.incr("store.derived_kept", len(kept))
+
+    def apply_external_change(self):
+        """
+        Merge a change another program made to the entries file (see
+        DataFileWatcher). Entries whose id and content are unchanged keep
+        their record objects; a pure append goes to the derived values
+        through apply_append like append() does, anything else drops them.
+        Publishes "entries" only when the list really changed. Returns
+        (added, removed, changed) counts, or None if there was nothing to
+        merge (not loaded yet, unchanged, or the file is mid-write).
+        """
+        if self._entries is None or self._loader is not None:
+            return None
+        sig = self._disk_signature()
+        if sig is None or sig == self._signature:
+            return None
+        try:
+            # parse directly: a half-written file must not go through
+            # load_json's rename-to-.bak recovery; the next event retries
+            with FileLock.for_path(self.path).hold(exclusive=False), open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+            data = json.loads(text)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, list):
+            return None
+        old = self._entries
+        old_by_id = {e.get("id"): e for e in old if isinstance(e, RECORD_TYPES) and e.get("id")}
+        # entries saved without an id got one in memory only; match those by key
+        old_by_key = {(e.get("timestamp"), e.get("regimen")): e for e in old_by_id.values()}
+        new = []
+        kept = changed = 0
+        for raw in data:
+            entry = as_entry_record(raw)
+            normalize_entry(entry, self.conc_index, only_missing=True)
+            if isinstance(entry, RECORD_TYPES):
+                if entry.get("id"):
+                    previous = old_by_id.pop(entry.get("id"), None)
+                else:
+                    previous = old_by_key.get((entry.get("timestamp"), entry.get("regimen")))
+                    if previous is not None and old_by_id.pop(previous.get("id"), None) is not None:
+                        entry["id"] = previous.get("id")
+                    else:
+                        previous = None
+                if previous is not None and previous == entry:
+                    entry = previous
+                    kept += 1
+                elif previous is not None:
+                    changed += 1
+                ensure_entry_id(entry)
+            new.append(entry)
+        self._signature = sig
+        prefix = len(new) >= len(old) and all(a is b for a, b in zip(old, new))
+        if prefix and len(new) == len(old):
+            return None
+        self._entries = new
+        if prefix:
+            self.version += 1
+            self._apply_appends(new[len(old):])
+        else:
+            self._bump()
+        METRICS.incr("store.external_change")
+        self._publish()
+        return len(new) - kept - changed, len(old_by_id), changed
+
+    def set_concentrations(self, concentrations, renormalize=True):
+        """
+        Update the mg/ml table. With renormalize, entries of medications whose
+        concentration changed are re-converted in one batch and saved once.
+        Returns the number of entries that changed.
+        """
+        new_index = concentration_index(concentrations)
+        changed_names = {
+            k for k in set(new_index) | set(self.conc_index)
+            if new_index.get(k) != self.conc_index.get(k)
+        }
+        self.conc_index = new_index
+        if renormalize:
+            self._pending_renormalize |= changed_names
+        try:
+            changed = self._renormalize_pending()
+        except FileLockTimeout as e:
+            self._lock_failed(e)
+            return 0
+        if changed:
+            self._publish()
+        return changed
+
+    def _renormalize_pending(self):
+        """
+        Re-convert the entries of medications in _pending_renormalize and
+        save them once. Until the entries are loaded (or while a background
+        load runs) the names stay pending; loads only fill in missing
+        canonical doses, so reload() and finish_background_load() call this
+        when they are done, and so does every _writing() section. Raises
+        FileLockTimeout with the names still pending.
+        """
+        names = self._pending_renormalize
+        if not names or self._entries is None or self._loader is not None:
+            return 0
+        self._pending_renormalize = set()
+        changed_entries = []
+        try:
+            with self._writing():
+                for e in self.entries():
+                    meds = e.get("medications") if isinstance(e, RECORD_TYPES) else None
+                    if isinstance(meds, list) and any(
+                        isinstance(m, RECORD_TYPES) and str(m.get("name", "")).strip().lower() in names
+                        for m in meds
+                    ):
+                        if normalize_entry(e, self.conc_index):
+                            changed_entries.append(e)
+                if changed_entries:
+                    self.wal.log([{"op": "update", "entry": e} for e in changed_entries])
+                    if save_entries(self._entries):
+                        self._signature = self._disk_signature()
+                        self.wal.clear()
+                    # on failure the log is kept, so the next start reapplies the conversion
+        except FileLockTimeout:
+            self._pending_renormalize |= names
+            raise
+        if changed_entries:
+            self._bump()
+        return len(changed_entries)
+
+    def _renormalize_after_load(self):
+        try:
+            self._renormalize_pending()
+        except FileLockTimeout:
+            # still pending; the next write section applies it
+            pass
+
+    def epochs(self):
+        """Regimen epochs (see RegimenEpochIndex), maintained incrementally on append."""
+        return self.derived("epochs", RegimenEpochIndex).epochs
+
+    def dose_stats(self):
+        """Per-medication DoseStats, maintained incrementally on append."""
+        return self.derived("dose_stats", DoseStats)
+
+    def day_counts(self):
+        """Entries per day (see DayCountIndex), maintained incrementally on append."""
+        return self.derived("day_counts", DayCountIndex)
+
+    def medication_trie(self):
+        """Medication names from history for autocomplete, maintained incrementally on append."""
+        return self.derived("medication_trie", self._build_medication_trie)
+
+    def _build_medication_trie(self, entries):
+        trie = MedicationTrie(entries)
+        trie.add_suggestions(self.medication_suggestions)
+        return trie
+
+    def set_medication_suggestions(self, names):
+        """
+        Set the not-yet-logged names autocomplete offers (defaults, Settings
+        regimens). A built trie gets new names added; if a name was removed
+        the trie is dropped and rebuilt with the new list on next use.
+        """
+        names = tuple(names)
+        removed = set(self.medication_suggestions) - set(names)
+        self.medication_suggestions = names
+        trie = self._derived.get("medication_trie")
+        if trie is None:
+            return
+        if removed:
+            del self._derived["medication_trie"]
+        else:
+            trie.add_suggestions(names)
+
+    def derived(self, name, builder):
+        """Return builder(entries), cached until the entries change."""
+        entries = self.entries()
+        if name not in self._derived:
+            METRICS.incr("store.derived_build")
+            self._derived[name] = builder(entries)
+        return self._derived[name]
+
+    def remember(self, name, key, builder):
+        """
+        Return builder(), cached in memory under (name, key). Unlike derived()
+        this does not load the entries first, so builders can serve results
+        from their own caches without parsing the data file.
+        """
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = builder()
+        self._derived[name] = (key, value)
+        return value
+
+
+# ------------------------ Dose units ------------------------
+
+_DOSE_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?|[.,]\d+")
+
+
+def _parse_dose_number(text):
+    """Return the first number in a free-text dose ("2", "2.5 mg", "0,5") or None."""
+    m = _DOSE_NUMBER_RE.search(str(text or ""))
+    if not m:
+        return None
+    try:
+        return float(m.group(0).replace(",", "."))
+    except ValueError:
+        return None
+
+
+# conversion factors to the canonical mass unit (mg)
+_MASS_UNITS_TO_MG = {"mg": 1.0, "mcg": 0.001, "µg": 0.001, "ug": 0.001, "g": 1000.0}
+
+
+def _dose_unit(med):
+    """Unit for a medication row: the Unit menu value, else a unit typed after the number."""
+    unit = str(med.get("unit", "") or "").strip().lower()
+    if unit:
+        return unit
+    m = re.search(r"\d\s*([^\d\s.,]+)\s*$", str(med.get("dose", "") or ""))
+    return m.group(1).lower() if m else ""
+
+
+def concentration_index(concentrations):
+    """Map lower-cased medication names to mg/ml from settings["concentrations"]."""
+    index = {}
+    for name, value in (concentrations or {}).items():
+        try:
+            v = float(value)
+        except (TypeError, ValueError):
+            continue
+        if v > 0:
+            index[str(name).strip().lower()] = v
+    return index
+
+
+def normalize_dose(med, conc_index=None):
+    """
+    Convert a medication row's dose to (value, canonical unit).
+    Mass units become mg; ml becomes mg when a concentration (mg/ml) is set
+    for the medication and stays ml otherwise; other units (units, patch,
+    ...) are kept as-is. value is None when the dose has no number.
+    """
+    value = _parse_dose_number(med.get("dose", ""))
+    unit = _dose_unit(med)
+    if value is None:
+        return None, unit
+    if unit in _MASS_UNITS_TO_MG:
+        return value * _MASS_UNITS_TO_MG[unit], "mg"
+    if unit == "ml":
+        conc = (conc_index or {}).get(str(med.get("name", "") or "").strip().lower())
+        if conc:
+            return value * conc, "mg"
+    return value, unit
+
+
+def normalize_entry(entry, conc_index=None, only_missing=False):
+    """
+    Store canonical_dose / canonical_unit next to the raw dose text of each
+    medication row. Returns True if any row changed.
+    """
+    changed = False
+    meds = entry.get("medications") if isinstance(entry, RECORD_TYPES) else None
+    if not isinstance(meds, list):
+        return False
+    for m in meds:
+        if not isinstance(m, RECORD_TYPES) or (only_missing and "canonical_unit" in m):
+            continue
+        value, unit = normalize_dose(m, conc_index)
+        if m.get("canonical_dose") != value or m.get("canonical_unit") != unit:
+            m["canonical_dose"] = value
+            m["canonical_unit"] = unit
+            changed = True
+    return changed
+
+
+def canonical_dose(med):
+    """(value, unit) as stored at write time; legacy rows are converted without concentrations."""
+    if "canonical_unit" in med:
+        return med.get("canonical_dose"), med.get("canonical_unit", "")
+    return normalize_dose(med)
+
+
+# ------------------------ Time series ------------------------
+
+def _timestamp_seconds(ts):
+    """Convert a stored "YYYY-MM-DD HH:MM" timestamp to epoch seconds (None if invalid)."""
+    try:
+        return datetime.strptime(str(ts)[:16], "%Y-%m-%d %H:%M").timestamp()
+    except Exception:
+        try:
+            return datetime.fromisoformat(str(ts)).timestamp()
+        except Exception:
+            return None
+
+
+def build_dose_series(entries):
+    """
+    Collect one (xs, ys) series per medication name and canonical unit.
+    xs are epoch seconds, ys the canonical dose; rows without a parsable
+    timestamp or dose are skipped. Names are grouped case-insensitively.
+    """
+    points = {}
+    labels = {}
+    for e in entries:
+        if not isinstance(e, RECORD_TYPES):
+            continue
+        meds = e.get("medications")
+        if not isinstance(meds, list) or not meds:
+            continue
+        x = _timestamp_seconds(e.get("timestamp", ""))
+        if x is None:
+            continue
+        for m in meds:
+            if not isinstance(m, RECORD_TYPES):
+                continue
+            name = str(m.get("name", "")).strip()
+            y, unit = canonical_dose(m)
+            if not name or y is None:
+                continue
+            key = (name.lower(), unit)
+            labels.setdefault(key, f"{name} ({unit})" if unit else name)
+            points.setdefault(key, []).append((x, y))
+    series = {}
+    for key, pts in points.items():
+        pts.sort()
+        series[labels[key]] = ([p[0] for p in pts], [p[1] for p in pts])
+    return series
+
+
+class SeriesPyramid:
+    """
+    Multi-resolution min/max pyramid over one (xs, ys) series.
+
+    Level 0 holds the raw points. Every further level splits the previous one
+    into buckets of BUCKET points and keeps only each bucket's lowest and
+    highest point, so peaks survive at every zoom level. A view asks for the
+    finest level that fits its point budget; panning only re-slices an
+    existing level and never touches the raw entries again.
+    """
+
+    BUCKET = 4
+    MIN_POINTS = 64
+
+    def __init__(self, xs, ys):
+        self.levels = [(list(xs), list(ys))]
+        while len(self.levels[-1][0]) > self.MIN_POINTS:
+            nxs, nys = self._reduce(*self.levels[-1])
+            if len(nxs) >= len(self.levels[-1][0]):
+                break
+            self.levels.append((nxs, nys))
+
+    def _reduce(self, xs, ys):
+        nxs, nys = [], []
+        for start in range(0, len(xs), self.BUCKET):
+            end = min(start + self.BUCKET, len(xs))
+            lo = hi = start
+            for i in range(start + 1, end):
+                if ys[i] < ys[lo]:
+                    lo = i
+                if ys[i] > ys[hi]:
+                    hi = i
+            for i in sorted({lo, hi}):
+                nxs.append(xs[i])
+                nys.append(ys[i])
+        return nxs, nys
+
+    def __len__(self):
+        return len(self.levels[0][0])
+
+    def bounds(self):
+        xs = self.levels[0][0]
+        if not xs:
+            return None
+        return xs[0], xs[-1]
+
+    def window(self, x0, x1, max_points=2000):
+        """
+        Return (xs, ys, level) for the range [x0, x1] with at most max_points
+        points (the coarsest level may exceed it for very small budgets).
+        One point beyond each edge is included so lines run off-canvas.
+        """
+        for level, (xs, ys) in enumerate(self.levels):
+            i0 = max(bisect_left(xs, x0) - 1, 0)
+            i1 = min(bisect_right(xs, x1) + 1, len(xs))
+            if i1 - i0 <= max_points or level == len(self.levels) - 1:
+                return xs[i0:i1], ys[i0:i1], level
+        return [], [], 0
+
+
+def build_dose_pyramids(entries):
+    """Build a SeriesPyramid for every medication dose series."""
+    return {name: SeriesPyramid(xs, ys) for name, (xs, ys) in build_dose_series(entries).items()}
+
+
+# ------------------------ Regimen change analysis ------------------------
+
+ANALYSIS_VERSION = 1
+_SYMPTOM_TOKEN_RE = re.compile(r"[^\W\d_][\w'-]{2,}")
+
+
+def _entry_medications(entry):
+    """Return the entry's medication dicts, falling back to the legacy "regimen" text."""
+    meds = entry.get("medications")
+    if isinstance(meds, list) and meds:
+        return [m for m in meds if isinstance(m, RECORD_TYPES)]
+    regimen = str(entry.get("regimen", "") or "")
+    return [{"name": n.strip(), "dose": entry.get("dose", "")} for n in regimen.split(",") if n.strip()]
+
+
+def _regimen_signature(entry):
+    """Normalized, order-independent (name, dose) tuple describing what was taken."""
+    sig = {}
+    for m in _entry_medications(entry):
+        name = str(m.get("name", "")).strip()
+        if name:
+            sig[name.lower()] = canonical_dose(m)[0]
+    return tuple(sorted(sig.items(), key=lambda kv: kv[0]))
+
+
+def _format_dose(med):
+    """Dose text with its unit, without doubling a unit already typed into the dose field."""
+    dose = str(med.get("dose", "") or "").strip()
+    unit = str(med.get("unit", "") or "").strip()
+    if unit and dose and not dose.endswith(unit):
+        return f"{dose} {unit}"
+    return dose
+
+
+def _symptom_tokens(text):
+    return {t.lower() for t in _SYMPTOM_TOKEN_RE.findall(str(text or ""))}
+
+
+def analyze_regimen_changes(entries, window=30, top_tokens=5):
+    """
+    Find regimen change points and compare mood/symptoms before and after.
+
+    Change points are the boundaries between regimen epochs (see
+    RegimenEpochIndex). Entries are sorted by timestamp and turned into
+    columns: a mood code and the symptom token set per entry. Mood counts
+    come from per-mood prefix sums, so each before/after window is a
+    subtraction rather than a rescan. The windows hold up to `window`
+    entries and never cross the neighbouring change points.
+    Returns a JSON-serializable dict.
+    """
+    rows = sorted(
+        (e for e in entries if isinstance(e, RECORD_TYPES)),
+        key=lambda e: e.get("timestamp", "") or ""
+    )
+    n = len(rows)
+    moods = list(DEFAULT_MOOD_OPTIONS)
+    mood_index = {m: i for i, m in enumerate(moods)}
+    tokens, codes = [], []
+    labels = {}
+    for e in rows:
+        for m in _entry_medications(e):
+            name = str(m.get("name", "")).strip()
+            if name:
+                labels.setdefault(name.lower(), name)
+        tokens.append(_symptom_tokens(e.get("symptoms", "")))
+        mood = str(e.get("mood", "") or "").strip()
+        if mood and mood not in mood_index:
+            mood_index[mood] = len(moods)
+            moods.append(mood)
+        codes.append(mood_index.get(mood, -1))
+
+    prefix = [[0] * (n + 1) for _ in moods]
+    for k, col in enumerate(prefix):
+        run = 0
+        for i, c in enumerate(codes):
+            if c == k:
+                run += 1
+            col[i + 1] = run
+
+    def mood_counts(lo, hi):
+        return {moods[k]: col[hi] - col[lo] for k, col in enumerate(prefix) if col[hi] - col[lo]}
+
+    def token_counts(lo, hi):
+        counts = {}
+        for i in range(lo, hi):
+            for t in tokens[i]:
+                counts[t] = counts.get(t, 0) + 1
+        return counts
+
+    epochs = RegimenEpochIndex(rows).epochs
+    points = []
+    start = 0
+    for ep in epochs:
+        points.append(start)
+        start += ep["count"]
+    points = points[1:]
+    changes = []
+    for j, i in enumerate(points):
+        prev_point = points[j - 1] if j > 0 else 0
+        next_point = points[j + 1] if j + 1 < len(points) else n
+        lo, hi = max(prev_point, i - window), min(next_point, i + window)
+
+        before, after = dict(epochs[j]["signature"]), dict(epochs[j + 1]["signature"])
+        dose_changes = [
+            {"name": labels.get(k, k), "before": before[k], "after": after[k]}
+            for k in sorted(before.keys() & after.keys()) if before[k] != after[k]
+        ]
+
+        tb, ta = token_counts(lo, i), token_counts(i, hi)
+        nb, na = i - lo, hi - i
+        deltas = []
+        for t in tb.keys() | ta.keys():
+            rate_b = tb.get(t, 0) / nb if nb else 0.0
+            rate_a = ta.get(t, 0) / na if na else 0.0
+            deltas.append((rate_a - rate_b, t))
+        deltas.sort()
+        more = [t for d, t in reversed(deltas[-top_tokens:]) if d > 0]
+        less = [t for d, t in deltas[:top_tokens] if d < 0]
+
+        changes.append({
+            "timestamp": rows[i].get("timestamp", ""),
+            "added": [labels.get(k, k) for k in sorted(after.keys() - before.keys())],
+            "removed": [labels.get(k, k) for k in sorted(before.keys() - after.keys())],
+            "dose_changes": dose_changes,
+            "before": {"entries": nb, "moods": mood_counts(lo, i), "symptoms": tb},
+            "after": {"entries": na, "moods": mood_counts(i, hi), "symptoms": ta},
+            "symptoms_more": more,
+            "symptoms_less": less,
+        })
+    return {"entries": n, "window": window, "changes": changes}
+
+
+class RegimenEpochIndex:
+    """
+    Run-length encoding of the time-sorted entries into regimen epochs:
+    maximal runs of consecutive entries with the same normalized
+    (medication, dose) set. Each epoch is a dict with "start", "end",
+    "count", "medications" (display names), "doses" (name -> dose text as
+    first logged) and "signature".
+
+    apply_append() extends the last epoch (or opens a new one) in O(1) when
+    the new entry is not older than the last one; back-dated entries return
+    False so the owning EntryStore rebuilds the index.
+    """
+
+    def __init__(self, entries=()):
+        self.epochs = []
+        rows = sorted(
+            (e for e in entries if isinstance(e, RECORD_TYPES)),
+            key=lambda e: e.get("timestamp", "") or ""
+        )
+        for e in rows:
+            self._add(e)
+
+    def _add(self, entry):
+        ts = entry.get("timestamp", "") or ""
+        sig = _regimen_signature(entry)
+        last = self.epochs[-1] if self.epochs else None
+        if last is not None and last["signature"] == sig:
+            last["end"] = ts
+            last["count"] += 1
+            return
+        meds = [m for m in _entry_medications(entry) if str(m.get("name", "")).strip()]
+        self.epochs.append({
+            "start": ts,
+            "end": ts,
+            "count": 1,
+            "medications": [str(m.get("name", "")).strip() for m in meds],
+            "doses": {str(m.get("name", "")).strip(): _format_dose(m) for m in meds},
+            "signature": sig,
+        })
+
+    def apply_append(self, entry):
+        if not isinstance(entry, RECORD_TYPES):
+            return False
+        ts = entry.get("timestamp", "") or ""
+        if self.epochs and ts < self.epochs[-1]["end"]:
+            return False
+        self._add(entry)
+        return True
+
+    def __len__(self):
+        return len(self.epochs)
+
+
+def regimen_change_report(store):
+    """
+    Return analyze_regimen_changes() for the store, using (in order) the
+    in-memory cache, the on-disk cache for the current data version, or a
+    fresh analysis which is then written to the on-disk cache.
+    """
+    key = f"{ANALYSIS_VERSION}:{store.data_key()}"
+
+    def build():
+        disk = load_json(ANALYSIS_CACHE_FILE, {})
+        if disk.get("data_key") == key and isinstance(disk.get("report"), dict):
+            return disk["report"]
+        report = analyze_regimen_changes(store.entries())
+        save_json(ANALYSIS_CACHE_FILE, {"data_key": key, "report": report})
+        return report
+
+    return store.remember("regimen_changes", key, build)
+
+
+def format_regimen_change_report(report):
+    """Render a regimen change report as plain text for the Trends page."""
+    changes = report.get("changes", [])
+    if not changes:
+        return "No regimen changes found yet. Changes appear here once medications or doses differ between entries."
+
+    def fmt_moods(block):
+        total = sum(block.get("moods", {}).values())
+        if not total:
+            return "no mood recorded"
+        parts = sorted(block["moods"].items(), key=lambda kv: -kv[1])
+        return ", ".join(f"{m} {round(100 * c / total)}%" for m, c in parts)
+
+    lines = []
+    for ch in reversed(changes):
+        what = []
+        if ch["added"]:
+            what.append("added " + ", ".join(ch["added"]))
+        if ch["removed"]:
+            what.append("stopped " + ", ".join(ch["removed"]))
+        for d in ch["dose_changes"]:
+            b = "?" if d["before"] is None else f"{d['before']:g}"
+            a = "?" if d["after"] is None else f"{d['after']:g}"
+            what.append(f"{d['name']} {b} → {a}")
+        lines.append(f"{ch['timestamp']} — {'; '.join(what)}")
+        lines.append(f"  Mood before ({ch['before']['entries']} entries): {fmt_moods(ch['before'])}")
+        lines.append(f"  Mood after  ({ch['after']['entries']} entries): {fmt_moods(ch['after'])}")
+        for label, key in (("more", "symptoms_more"), ("less", "symptoms_less")):
+            if ch[key]:
+                toks = ", ".join(
+                    f"{t} ({ch['before']['symptoms'].get(t, 0)}→{ch['after']['symptoms'].get(t, 0)})"
+                    for t in ch[key]
+                )
+                lines.append(f"  Symptoms mentioned {label} often: {toks}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# ------------------------ Dose anomaly detection ------------------------
+
+def _dose_key(med):
+    """Group doses by medication name and canonical unit (mg, ml, units, ...)."""
+    return (str(med.get("name", "") or "").strip().lower(), canonical_dose(med)[1])
+
+
+class DoseStats:
+    """
+    Robust per-medication dose statistics used to catch typos like "20"
+    for "2.0", computed on canonical doses. Doses are compared on a log10
+    scale (typos are usually a slipped decimal point, i.e. a factor of
+    10): a dose is flagged when it is more than THRESHOLD robust standard
+    deviations (1.4826 * MAD) from the median log dose and at least
+    MIN_FACTOR times off in either direction. Keys with fewer than
+    MIN_SAMPLES doses are never flagged.
+
+    Values are kept sorted per key so the median is O(1); the MAD is
+    recomputed lazily for the one key an append touched.
+    """
+
+    MIN_SAMPLES = 5
+    THRESHOLD = 5.0
+    MIN_FACTOR = 3.0
+
+    def __init__(self, entries=()):
+        self._values = {}
+        self._spread = {}
+        groups = {}
+        for e in entries:
+            if isinstance(e, RECORD_TYPES):
+                for key, v in self._entry_doses(e):
+                    groups.setdefault(key, []).append(v)
+        for key, vals in groups.items():
+            vals.sort()
+            self._values[key] = vals
+
+    @staticmethod
+    def _entry_doses(entry):
+        for m in _entry_medications(entry):
+            v = canonical_dose(m)[0]
+            if v is not None and v > 0 and str(m.get("name", "")).strip():
+                yield _dose_key(m), math.log10(v)
+
+    def apply_append(self, entry):
+        if not isinstance(entry, RECORD_TYPES):
+            return False
+        for key, v in self._entry_doses(entry):
+            insort(self._values.setdefault(key, []), v)
+            self._spread.pop(key, None)
+        return True
+
+    def _center_and_limit(self, key):
+        vals = self._values.get(key)
+        if not vals or len(vals) < self.MIN_SAMPLES:
+            return None
+        n = len(vals)
+        med = vals[n // 2] if n % 2 else (vals[n // 2 - 1] + vals[n // 2]) / 2
+        if key not in self._spread:
+            devs = sorted(abs(v - med) for v in vals)
+            mad = devs[n // 2] if n % 2 else (devs[n // 2 - 1] + devs[n // 2]) / 2
+            self._spread[key] = max(self.THRESHOLD * 1.4826 * mad, math.log10(self.MIN_FACTOR))
+        return med, self._spread[key]
+
+    def check(self, med):
+        """
+        Return None if the medication row's dose looks normal (or cannot be
+        judged), otherwise the typical dose (median) it deviates from.
+        """
+        v = canonical_dose(med)[0]
+        if v is None or v <= 0:
+            return None
+        stats = self._center_and_limit(_dose_key(med))
+        if stats is None:
+            return None
+        center, limit = stats
+        if abs(math.log10(v) - center) > limit:
+            return 10 ** center
+        return None
+
+    def outliers(self, entries):
+        """
+        Scan entries against the current statistics in one pass; returns
+        dicts with timestamp, name, dose text and typical dose.
+        """
+        limits = {key: self._center_and_limit(key) for key in self._values}
+        found = []
+        for e in entries:
+            if not isinstance(e, RECORD_TYPES):
+                continue
+            for m in _entry_medications(e):
+                v = canonical_dose(m)[0]
+                stats = limits.get(_dose_key(m)) if v is not None and v > 0 else None
+                if stats and abs(math.log10(v) - stats[0]) > stats[1]:
+                    found.append({
+                        "timestamp": e.get("timestamp", ""),
+                        "name": str(m.get("name", "")).strip(),
+                        "dose": _format_dose(m),
+                        "typical": 10 ** stats[0],
+                        "unit": _dose_key(m)[1],
+                    })
+        return found
+
+
+# ------------------------ Entry calendar ------------------------
+
+class DayCountIndex:
+    """Number of entries per calendar day, for the calendar heat map."""
+
+    def __init__(self, entries):
+        # (year, month) -> {day: count}
+        self.months = {}
+        for e in entries:
+            self._add(e)
+
+    def _add(self, entry):
+        if not isinstance(entry, RECORD_TYPES):
+            return
+        d = _entry_date(entry)
+        if d is not None:
+            days = self.months.setdefault((d.year, d.month), {})
+            days[d.day] = days.get(d.day, 0) + 1
+
+    def month(self, year, month):
+        """{day of month: entry count} for days that have entries."""
+        return self.months.get((year, month), {})
+
+    def apply_append(self, entry):
+        self._add(entry)
+        return True
+
+
+# ------------------------ Medication autocomplete ------------------------
+
+class _TrieNode:
+    __slots__ = ("children", "names", "top")
+
+    def __init__(self):
+        self.children = None  # None while the node is still a bucket
+        self.names = []       # bucket contents, or keys ending exactly here once split
+        self.top = []         # best-ranked keys in this subtree, at most MedicationTrie.TOP
+
+
+class MedicationTrie:
+    """
+    Ranked prefix lookup over medication names (case-insensitive).
+
+    A burst trie: a node holds a plain bucket of names until it grows past
+    BUCKET, then splits into one child per next character. Every node keeps
+    the TOP best names of its subtree, so a lookup walks len(prefix) nodes
+    and at most filters one small bucket; no subtree is ever scanned.
+
+    Ranking is frequency with exponential decay: a use adds 2**(n/HALF_LIFE)
+    where n counts all uses so far, so older uses weigh less without ever
+    rescoring other names. Scores are kept as logarithms to stay finite.
+    Names only offered as suggestions (defaults, Settings regimens) rank
+    below anything actually logged.
+    """
+
+    BUCKET = 32
+    TOP = 8
+    HALF_LIFE = 200.0
+    SUGGESTION_SCORE = -1e18
+
+    def __init__(self, entries=()):
+        self.root = _TrieNode()
+        self.scores = {}
+        self.labels = {}
+        self.uses = 0
+        # score the whole history first, then insert each distinct name once
+        for e in entries:
+            for m in _entry_medications(e) if isinstance(e, RECORD_TYPES) else ():
+                self._score(m.get("name", ""))
+        for key in self.scores:
+            self._touch(key)
+
+    def _rank(self, key):
+        return (-self.scores[key], key)
+
+    def _update_top(self, node, key):
+        if key in node.top:
+            node.top.sort(key=self._rank)
+        elif len(node.top) < self.TOP or self._rank(key) < self._rank(node.top[-1]):
+            node.top.append(key)
+            node.top.sort(key=self._rank)
+            del node.top[self.TOP:]
+
+    def _split(self, node, depth):
+        node.children = {}
+        bucket, node.names = node.names, []
+        for key in bucket:
+            if len(key) == depth:
+                node.names.append(key)
+                continue
+            child = node.children.get(key[depth])
+            if child is None:
+                child = node.children[key[depth]] = _TrieNode()
+            child.names.append(key)
+        for child in node.children.values():
+            child.top = sorted(child.names, key=self._rank)[:self.TOP]
+
+    def _touch(self, key):
+        """Insert key if new and refresh the top lists along its path."""
+        node, depth = self.root, 0
+        while True:
+            self._update_top(node, key)
+            if node.children is None:
+                if key not in node.names:
+                    node.names.append(key)
+                    if len(node.names) > self.BUCKET:
+                        self._split(node, depth)
+                return
+            if depth == len(key):
+                if key not in node.names:
+                    node.names.append(key)
+                return
+            child = node.children.get(key[depth])
+            if child is None:
+                child = node.children[key[depth]] = _TrieNode()
+            node, depth = child, depth + 1
+
+    def add(self, name):
+        """Record one use of name."""
+        key = self._score(name)
+        if key:
+            self._touch(key)
+
+    def _score(self, name):
+        label = str(name or "").strip()
+        key = label.lower()
+        if not key:
+            return None
+        weight = self.uses / self.HALF_LIFE * math.log(2)
+        self.uses += 1
+        old = self.scores.get(key)
+        if old is None or old == self.SUGGESTION_SCORE:
+            self.scores[key] = weight
+        else:
+            # log(exp(old) + exp(weight)) without overflow
+            hi, lo = max(old, weight), min(old, weight)
+            self.scores[key] = hi + math.log1p(math.exp(lo - hi))
+        self.labels[key] = label
+        return key
+
+    def add_suggestions(self, names):
+        """Offer names that have not been logged yet (kept below logged ones)."""
+        for name in names:
+            label = str(name or "").strip()
+            key = label.lower()
+            if key and key not in self.scores:
+                self.scores[key] = self.SUGGESTION_SCORE
+                self.labels[key] = label
+                self._touch(key)
+
+    def complete(self, prefix, limit=None):
+        """Best names starting with prefix (case-insensitive), display casing kept."""
+        limit = limit or self.TOP
+        prefix = str(prefix or "").strip().lower()
+        node, depth = self.root, 0
+        while depth < len(prefix):
+            if node.children is None:
+                found = sorted((k for k in node.names if k.startswith(prefix)), key=self._rank)
+                return [self.labels[k] for k in found[:limit]]
+            node = node.children.get(prefix[depth])
+            if node is None:
+                return []
+            depth += 1
+        return [self.labels[k] for k in node.top[:limit]]
+
+    def apply_append(self, entry):
+        for m in _entry_medications(entry) if isinstance(entry, RECORD_TYPES) else ():
+            self.add(m.get("name", ""))
+        return True
+
+
+# ------------------------ History filtering ------------------------
+# Pure helpers behind HistoryPage, kept free of Tk so they can be benchmarked.
+
+def _entry_date(entry):
+    ts = entry.get("timestamp", "")
+    if not ts:
+        return None
+    date_part = ts.split()[0]
+    try:
+        return datetime.strptime(date_part, "%Y-%m-%d").date()
+    except Exception:
+        try:
+            return datetime.fromisoformat(ts).date()
+        except Exception:
+            return None
+
+
+def entry_search_text(entry):
+    """Lowercased text of every field (list fields flattened), used for search."""
+    parts = []
+    for v in entry.values():
+        if isinstance(v, list):
+            parts.extend(str(x) for x in v)
+        else:
+            parts.append(str(v))
+    return " ".join(parts).lower()
+
+
+def filter_entries(entries, query="", start_date=None, end_date=None):
+    """Entries matching a lowercase query and inclusive date range, newest first."""
+    out = []
+    for entry in sorted(entries, key=lambda e: e.get("timestamp", "") or "", reverse=True):
+        if query and query not in entry_search_text(entry):
+            continue
+        if start_date or end_date:
+            ed = _entry_date(entry)
+            if start_date and (ed is None or ed < start_date):
+                continue
+            if end_date and (ed is None or ed > end_date):
+                continue
+        out.append(entry)
+    return out
+
 
-def save_bug_reports(reports):
-    if not isinstance(reports, list):
-        reports = []
-    save_json(BUGS_FILE, reports)
+def find_entry_index(entries, entry):
+    """Index of the stored entry with the same (timestamp, regimen) key, or None."""
+    key = (entry.get("timestamp"), entry.get("regimen"))
+    return next((i for i, e in enumerate(entries)
+                 if (e.get("timestamp"), e.get("regimen")) == key), None)
 
-def load_contributions():
-    return load_json(CONTRIB_FILE, [])
 
-def save_contributions(contribs):
-    if not isinstance(contribs, list):
-        contribs = []
-    save_json(CONTRIB_FILE, contribs)
+def export_entries(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False, default=_json_default)
 
 
 # ------------------------ Base Page ------------------------
 
 class BasePage(ctk.CTkFrame):
+    # data topics shown by this page (see InvalidationBus)
+    depends_on = ("settings",)
+
     def __init__(self, master, controller, **kwargs):
         super().__init__(master, **kwargs)
         self.controller = controller
+        self._dirty = set()
+        try:
+            for topic in self.depends_on:
+                controller.bus.subscribe(topic, self._on_invalidated)
+        except Exception:
+            pass
 
     def show(self):
         self.lift()
 
+    def on_hide(self):
+        """Called when another page is shown or the window is minimized."""
+        pass
+
     def refresh_language(self):
         pass
 
+    def _on_invalidated(self, topic):
+        """Mark the page dirty; only the visible page refreshes right away."""
+        self._dirty.add(topic)
+        try:
+            if self.controller.pages.get(self.controller.current_page) is self:
+                self.refresh_if_dirty()
+        except Exception:
+            pass
+
+    def refresh_if_dirty(self):
+        if not self._dirty:
+            return
+        topics, self._dirty = self._dirty, set()
+        try:
+            self.refresh_view(topics)
+        except Exception:
+            pass
+
+    def refresh_view(self, topics):
+        """Bring the page up to date after the given topics changed."""
+        if "settings" in topics:
+            self.refresh_language()
+
     # NEW: default focus helper - pages may override to focus a useful widget
     def focus_first(self):
         try:
@@ -337,7 +3380,21 @@ class BasePage(ctk.CTkFrame):
 
 # NEW: simple calendar popup for date selection
 class CalendarPopup(ctk.CTkToplevel):
-    def __init__(self, master, select_callback, init_date=None, date_format="%Y-%m-%d"):
+    """
+    Month picker. The 6x7 grid of day buttons is created once and only
+    reconfigured when the month changes; with a DayCountIndex the days are
+    shaded by how many entries were logged on them.
+    """
+
+    # fill colors (light, dark) for 1, 2, 3 and 4+ entries on a day
+    HEAT_COLORS = [
+        ("#b7e4c7", "#1b4332"),
+        ("#74c69d", "#2d6a4f"),
+        ("#40916c", "#40916c"),
+        ("#1b4332", "#74c69d"),
+    ]
+
+    def __init__(self, master, select_callback, init_date=None, date_format="%Y-%m-%d", day_counts=None):
         super().__init__(master)
         try:
             self.transient(master)
@@ -349,6 +3406,7 @@ class CalendarPopup(ctk.CTkToplevel):
             pass
         self.select_callback = select_callback
         self.date_format = date_format
+        self.day_counts = day_counts
         self.title("Select date")
         self.resizable(False, False)
         self.init_date = init_date or date.today()
@@ -370,13 +3428,20 @@ class CalendarPopup(ctk.CTkToplevel):
         days_frame.pack(padx=8, pady=(4,8))
         # weekday labels
         wkdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        lbl_row = ctk.CTkFrame(days_frame)
-        lbl_row.pack(fill="x")
-        for d in wkdays:
-            ctk.CTkLabel(lbl_row, text=d, width=40).pack(side="left", padx=2)
+        for col, d in enumerate(wkdays):
+            ctk.CTkLabel(days_frame, text=d, width=40).grid(row=0, column=col, padx=2)
+
+        self._cell_days = [0] * 42
+        self._cells = []
+        for i in range(42):
+            btn = ctk.CTkButton(days_frame, text="", width=40, command=lambda i=i: self._on_cell(i))
+            btn.grid(row=1 + i // 7, column=i % 7, padx=2, pady=2)
+            self._cells.append(btn)
+        self._default_fg = self._cells[0].cget("fg_color")
+        self._default_text = self._cells[0].cget("text_color")
 
-        self.grid_frame = ctk.CTkFrame(days_frame)
-        self.grid_frame.pack()
+        self.count_lbl = ctk.CTkLabel(self, text="", anchor="w")
+        self.count_lbl.pack(fill="x", padx=10)
 
         ctl_row = ctk.CTkFrame(self)
         ctl_row.pack(fill="x", padx=8, pady=(0,8))
@@ -385,35 +3450,57 @@ class CalendarPopup(ctk.CTkToplevel):
         self._render_month()
 
     def _render_month(self):
-        # update month label and grid
-        try:
-            for w in self.grid_frame.winfo_children():
-                w.destroy()
-        except Exception:
-            pass
+        # update month label and reconfigure the fixed grid of day cells
         try:
             mname = f"{calendar.month_name[self.current_month]} {self.current_year}"
             self.month_lbl.configure(text=mname)
         except Exception:
             pass
-        try:
-            weeks = calendar.monthcalendar(self.current_year, self.current_month)
-            for wr in weeks:
-                row = ctk.CTkFrame(self.grid_frame)
-                row.pack(fill="x")
-                for day in wr:
-                    if day == 0:
-                        ctk.CTkLabel(row, text="", width=40).pack(side="left", padx=2, pady=2)
-                    else:
-                        d_btn = ctk.CTkButton(
-                            row,
-                            text=str(day),
-                            width=40,
-                            command=lambda dd=day: self._select_day(dd)
-                        )
-                        d_btn.pack(side="left", padx=2, pady=2)
-        except Exception:
-            pass
+        counts = {}
+        if self.day_counts is not None:
+            try:
+                counts = self.day_counts.month(self.current_year, self.current_month)
+            except Exception:
+                counts = {}
+        weeks = calendar.monthcalendar(self.current_year, self.current_month)
+        days = [d for wr in weeks for d in wr]
+        days += [0] * (42 - len(days))
+        is_init_month = (self.current_year, self.current_month) == (self.init_date.year, self.init_date.month)
+        for i, (btn, day) in enumerate(zip(self._cells, days)):
+            self._cell_days[i] = day
+            try:
+                if not day:
+                    btn.configure(text="", state="disabled", fg_color="transparent", border_width=0)
+                    continue
+                count = counts.get(day, 0)
+                if count:
+                    level = min(count, len(self.HEAT_COLORS)) - 1
+                    fg = self.HEAT_COLORS[level]
+                    # dark text on the pale shades, light text on the deep ones
+                    text_color = ("#000000", "#ffffff") if level < 2 else ("#ffffff", "#000000")
+                else:
+                    fg, text_color = self._default_fg, self._default_text
+                btn.configure(
+                    text=str(day),
+                    state="normal",
+                    fg_color=fg,
+                    text_color=text_color,
+                    border_width=2 if is_init_month and day == self.init_date.day else 0,
+                )
+            except Exception:
+                pass
+        total = sum(counts.values())
+        days = len(counts)
+        self.count_lbl.configure(
+            text=(
+                f"{total} {'entry' if total == 1 else 'entries'} on "
+                f"{days} {'day' if days == 1 else 'days'} this month"
+            ) if self.day_counts is not None else ""
+        )
+
+    def _on_cell(self, i):
+        if self._cell_days[i]:
+            self._select_day(self._cell_days[i])
 
     def _select_day(self, day):
         try:
@@ -458,6 +3545,111 @@ class CalendarPopup(ctk.CTkToplevel):
             pass
 
 
+class SuggestionList(ctk.CTkFrame):
+    """
+    Drop-down of completions shown under whichever attached CTkEntry is
+    being typed in. source(text) returns the suggestions; the row buttons
+    are created once and reused. Up/Down move, Return/Tab accept, Escape
+    closes.
+    """
+
+    _NAV_KEYS = {"Up", "Down", "Return", "Tab", "Escape", "Left", "Right",
+                 "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+    def __init__(self, master, source, max_items=8):
+        super().__init__(master, corner_radius=6, border_width=1)
+        self.source = source
+        self.entry = None
+        self.active = -1
+        self.values = []
+        self._highlight = ctk.ThemeManager.theme["CTkButton"]["hover_color"]
+        self._buttons = []
+        for i in range(max_items):
+            self._buttons.append(ctk.CTkButton(
+                self, text="", anchor="w", height=24, fg_color="transparent",
+                text_color=("gray10", "gray90"), command=lambda i=i: self.accept(i)
+            ))
+
+    def attach(self, entry):
+        entry.bind("<KeyRelease>", lambda e, en=entry: self._on_key(en, e), add="+")
+        entry.bind("<Down>", lambda e: self._move(1), add="+")
+        entry.bind("<Up>", lambda e: self._move(-1), add="+")
+        entry.bind("<Return>", lambda e: self._accept_active(), add="+")
+        entry.bind("<Tab>", lambda e: self._accept_active(), add="+")
+        entry.bind("<Escape>", lambda e: self.hide(), add="+")
+        # delayed so a click on a suggestion lands before the list closes
+        entry.bind("<FocusOut>", lambda e: self.after(150, self.hide), add="+")
+
+    def visible(self):
+        return bool(self.winfo_ismapped())
+
+    def _on_key(self, entry, event):
+        if getattr(event, "keysym", "") in self._NAV_KEYS:
+            return
+        text = entry.get().strip()
+        try:
+            values = self.source(text) if text else []
+        except Exception:
+            values = []
+        if not values or (len(values) == 1 and values[0].lower() == text.lower()):
+            self.hide()
+            return
+        self.entry = entry
+        self.show(values)
+
+    def show(self, values):
+        self.values = values[:len(self._buttons)]
+        self.active = -1
+        for i, btn in enumerate(self._buttons):
+            if i < len(self.values):
+                btn.configure(text=self.values[i], fg_color="transparent")
+                btn.pack(fill="x", padx=2, pady=1)
+            else:
+                btn.pack_forget()
+        try:
+            master = self.master
+            x = self.entry.winfo_rootx() - master.winfo_rootx()
+            y = self.entry.winfo_rooty() - master.winfo_rooty() + self.entry.winfo_height()
+            self.place(x=x, y=y, width=max(self.entry.winfo_width(), 160))
+            self.lift()
+        except Exception:
+            pass
+
+    def hide(self):
+        self.active = -1
+        try:
+            self.place_forget()
+        except Exception:
+            pass
+
+    def _move(self, step):
+        if not self.visible() or not self.values:
+            return None
+        self.active = (self.active + step) % len(self.values)
+        for i, btn in enumerate(self._buttons[:len(self.values)]):
+            btn.configure(fg_color=self._highlight if i == self.active else "transparent")
+        return "break"
+
+    def _accept_active(self):
+        if not self.visible() or self.active < 0:
+            self.hide()
+            return None
+        self.accept(self.active)
+        return "break"
+
+    def accept(self, i):
+        if self.entry is None or not 0 <= i < len(self.values):
+            return
+        try:
+            self.entry.delete(0, "end")
+            self.entry.insert(0, self.values[i])
+            self.entry.icursor("end")
+            self.entry.focus_set()
+        except Exception:
+            pass
+        self.hide()
+
+
 class HRTLogPage(BasePage):
     def __init__(self, master, controller):
         super().__init__(master, controller)
@@ -467,7 +3659,10 @@ class HRTLogPage(BasePage):
 
         self.clock_label = ctk.CTkLabel(self, font=("Arial", 10))
         self.clock_label.pack()
-        self.update_clock()
+        # ticks only while this page is visible (see show/on_hide)
+        self._clock_fmt = None
+        self._clock_ticker = AlignedTicker(self, self.update_clock)
+        self._apply_clock_settings()
 
         self.info_label = ctk.CTkLabel(self, justify="left")
         self.info_label.pack(pady=5)
@@ -500,27 +3695,7 @@ class HRTLogPage(BasePage):
         self.title_entry = ctk.CTkEntry(title_row, placeholder_text="Short title (optional)")
         self.title_entry.pack(side="left", fill="x", expand=True)
 
-        try:
-            now = datetime.now()
-            date_fmt = self.controller.settings.get("date_format", "%Y-%m-%d")
-            time_fmt = self.controller.settings.get("time_format", "%H:%M")
-            try:
-                date_preview = now.strftime(date_fmt)
-            except Exception:
-                date_fmt = "%Y-%m-%d"
-                date_preview = now.strftime(date_fmt)
-            try:
-                time_preview = now.strftime(time_fmt)
-            except Exception:
-                time_fmt = "%H:%M"
-                time_preview = now.strftime(time_fmt)
-
-            if not self.date_entry.get().strip():
-                self.date_entry.insert(0, date_preview)
-            if not self.time_entry.get().strip():
-                self.time_entry.insert(0, time_preview)
-        except Exception:
-            pass
+        self._prefill_now()
 
         self.meds_container = ctk.CTkFrame(form_frame)
         self.meds_container.pack(pady=5, fill="x")
@@ -575,15 +3750,56 @@ class HRTLogPage(BasePage):
         self.refresh_language()
 
     def update_clock(self):
+        try:
+            self.clock_label.configure(text=datetime.now().strftime(self._clock_fmt))
+        except Exception:
+            pass
+
+    def _apply_clock_settings(self):
+        show_seconds = bool(self.controller.settings.get("show_seconds", True))
+        fmt = "Now: %Y-%m-%d %H:%M:%S" if show_seconds else "Now: %Y-%m-%d %H:%M"
+        if fmt == self._clock_fmt:
+            return
+        self._clock_fmt = fmt
+        self._clock_ticker.set_period(1.0 if show_seconds else 60.0)
+        self.update_clock()
+
+    def show(self):
+        super().show()
+        self._clock_ticker.start()
+
+    def on_hide(self):
+        self._clock_ticker.stop()
+
+    def _prefill_now(self):
+        """Put the current date/time into empty date and time fields."""
         try:
             now = datetime.now()
-            show_seconds = bool(self.controller.settings.get("show_seconds", True))
-            fmt = "Now: %Y-%m-%d %H:%M:%S" if show_seconds else "Now: %Y-%m-%d %H:%M"
-            self.clock_label.configure(text=now.strftime(fmt))
+            date_fmt = self.controller.settings.get("date_format", "%Y-%m-%d")
+            time_fmt = self.controller.settings.get("time_format", "%H:%M")
+            try:
+                date_preview = now.strftime(date_fmt)
+            except Exception:
+                date_fmt = "%Y-%m-%d"
+                date_preview = now.strftime(date_fmt)
+            try:
+                time_preview = now.strftime(time_fmt)
+            except Exception:
+                time_fmt = "%H:%M"
+                time_preview = now.strftime(time_fmt)
+
+            if not self.date_entry.get().strip():
+                self.date_entry.insert(0, date_preview)
+            if not self.time_entry.get().strip():
+                self.time_entry.insert(0, time_preview)
         except Exception:
             pass
+
+    def start_quick_log(self):
+        """Ready the form for a new entry now (--quick-log)."""
+        self._prefill_now()
         try:
-            self.after(1000, self.update_clock)
+            self.med_rows[0]["name"].focus_set()
         except Exception:
             pass
 
@@ -593,6 +3809,12 @@ class HRTLogPage(BasePage):
 
         name_entry = ctk.CTkEntry(row_frame, placeholder_text="Medication name")
         name_entry.pack(side="left", fill="x", expand=True, padx=(0, 6))
+        try:
+            if getattr(self, "med_suggestions", None) is None:
+                self.med_suggestions = SuggestionList(self, self._suggest_medications)
+            self.med_suggestions.attach(name_entry)
+        except Exception:
+            pass
 
         dose_entry = ctk.CTkEntry(row_frame, width=120, placeholder_text="Dose")
         dose_entry.pack(side="left", padx=(0, 6))
@@ -711,6 +3933,10 @@ class HRTLogPage(BasePage):
         else:
             dose_entry.insert("end", f" {value}")
 
+    def _suggest_medications(self, prefix):
+        """Autocomplete source: names from history (frequent and recent first), then regimen suggestions."""
+        return self.controller.store.medication_trie().complete(prefix)
+
     def insert_regimen_suggestion(self, value):
         if not value or value in ("Suggest…", "Other"):
             return
@@ -739,6 +3965,7 @@ class HRTLogPage(BasePage):
         except Exception:
             raise ValueError("Could not parse date/time.")
 
+    @watched("save_entry")
     def save_entry(self):
         date_text = self.date_entry.get().strip()
         time_text = self.time_entry.get().strip()
@@ -811,9 +4038,27 @@ class HRTLogPage(BasePage):
             messagebox.showinfo("Missing info", "Please enter at least one medication name.")
             return
 
-        entries = load_entries()
-        entries.append(entry)
-        save_entries(entries)
+        normalize_entry(entry, self.controller.store.conc_index)
+        try:
+            stats = self.controller.store.dose_stats()
+            unusual = []
+            for m in meds:
+                typical = stats.check(m)
+                if typical is not None:
+                    unusual.append(
+                        f"- {m['name']}: {_format_dose(m)} (usually about {typical:.3g} {m.get('canonical_unit', '')})"
+                    )
+        except Exception:
+            unusual = []
+        if unusual and not messagebox.askyesno(
+            "Unusual dose",
+            "These doses are far from what you usually log:\n" + "\n".join(unusual) +
+            "\n\nCheck for a typo (e.g. a missing decimal point). Save anyway?"
+        ):
+            return
+
+        if not self.controller.store.append(entry):
+            return
 
         self.date_entry.delete(0, "end")
         self.time_entry.delete(0, "end")
@@ -835,16 +4080,15 @@ class HRTLogPage(BasePage):
         except Exception:
             pass
 
-        try:
-            self.controller.refresh_all_pages()
-        except Exception:
-            pass
-
         messagebox.showinfo("Saved", "Entry saved.")
 
     def refresh_language(self):
         inclusive = self.controller.settings.get("inclusive_language", True)
         self.title_label.configure(text="HRT Log")
+        try:
+            self._apply_clock_settings()
+        except Exception:
+            pass
         if inclusive:
             self.info_label.configure(
                 text="This space is for your own tracking.\n"
@@ -937,7 +4181,15 @@ class HRTLogPage(BasePage):
                     pass
 
             # show popup
-            CalendarPopup(self, _on_select, init_date=init, date_format=self.controller.settings.get("date_format", "%Y-%m-%d"))
+            try:
+                day_counts = self.controller.store.day_counts()
+            except Exception:
+                day_counts = None
+            CalendarPopup(
+                self, _on_select, init_date=init,
+                date_format=self.controller.settings.get("date_format", "%Y-%m-%d"),
+                day_counts=day_counts,
+            )
         except Exception:
             pass
 
@@ -945,6 +4197,8 @@ class HRTLogPage(BasePage):
 # ------------------------ History Page ------------------------
 
 class HistoryPage(BasePage):
+    depends_on = ("settings", "entries")
+
     def __init__(self, master, controller):
         super().__init__(master, controller)
 
@@ -974,6 +4228,15 @@ class HistoryPage(BasePage):
         export_btn = ctk.CTkButton(filter_frame, text="Export", command=self.export_filtered)
         export_btn.pack(side="left", padx=5)
 
+        # regimen epochs instead of individual entries
+        self.summary_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(
+            filter_frame,
+            text="Summary",
+            variable=self.summary_var,
+            command=self.refresh_list
+        ).pack(side="left", padx=5)
+
         self.list_frame = ctk.CTkScrollableFrame(self, width=300, height=460)
         self.list_frame.pack(side="left", padx=10, pady=10, fill="y")
 
@@ -989,6 +4252,8 @@ class HistoryPage(BasePage):
         self.delete_btn.pack(side="left", padx=(0, 6))
         self.duplicate_btn = ctk.CTkButton(actions_row, text="Duplicate Entry", command=self.duplicate_selected_entry)
         self.duplicate_btn.pack(side="left")
+        self.check_doses_btn = ctk.CTkButton(actions_row, text="Check Doses", command=self.check_doses)
+        self.check_doses_btn.pack(side="left", padx=(6, 0))
 
         self.selected_index = None
 
@@ -1005,12 +4270,20 @@ class HistoryPage(BasePage):
         else:
             self.search_entry.configure(placeholder_text="Search entries")
 
+    def refresh_view(self, topics):
+        if "settings" in topics:
+            self.refresh_language()
+        if "entries" in topics:
+            self.refresh_list()
+
     def clear_filters(self):
         self.search_entry.delete(0, "end")
         self.start_date_entry.delete(0, "end")
         self.end_date_entry.delete(0, "end")
         self.refresh_list()
 
+    @timed("export_filtered")
+    @watched("export_filtered")
     def export_filtered(self):
         if not getattr(self, "display_entries", None):
             messagebox.showinfo("Nothing", "No entries to export with current filter.")
@@ -1019,16 +4292,16 @@ class HistoryPage(BasePage):
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.display_entries, f, indent=2, ensure_ascii=False)
+            export_entries(path, self.display_entries)
             messagebox.showinfo("Exported", f"Exported {len(self.display_entries)} entries.")
         except Exception as e:
             messagebox.showerror("Export failed", str(e))
 
+    # rows are built later in slices; "refresh_list" itself is recorded by
+    # _render_rows once the last row is in
+    @timed("refresh_list.filter")
+    @watched("refresh_list.filter")
     def refresh_list(self):
-        for widget in self.list_frame.winfo_children():
-            widget.destroy()
-
         query = self.search_entry.get().strip().lower()
         start_text = self.start_date_entry.get().strip()
         end_text = self.end_date_entry.get().strip()
@@ -1046,79 +4319,201 @@ class HistoryPage(BasePage):
         except Exception:
             end_date = None
 
-        entries = load_entries()
-        if not isinstance(entries, list):
-            entries = []
+        # large files are parsed in the background; show the newest entries meanwhile
+        store = self.controller.store
+        if not store.is_loaded():
+            loader = store.load_in_background()
+            if loader is not None and not loader.done:
+                self._show_loading(loader, query, start_date, end_date)
+                return
 
-        def entry_date(e):
-            ts = e.get("timestamp", "")
-            if not ts:
-                return None
-            date_part = ts.split()[0]
-            try:
-                return datetime.strptime(date_part, "%Y-%m-%d").date()
-            except Exception:
-                try:
-                    return datetime.fromisoformat(ts).date()
-                except Exception:
-                    return None
+        if self.summary_var.get():
+            self._refresh_summary(query, start_text if start_date else "", end_text if end_date else "")
+            return
 
-        entries_sorted = sorted(entries, key=lambda e: e.get("timestamp", "") or "", reverse=True)
+        self.display_entries = filter_entries(store.entries(), query, start_date, end_date)
+        self._render_rows(self._entry_rows(self.display_entries))
 
-        self.display_entries = []
+        if not self.display_entries:
+            self.detail_box.delete("1.0", "end")
+            self.detail_box.insert("1.0", "No entries match this filter.")
+            self.selected_index = None
 
-        for entry in entries_sorted:
-            parts = []
-            for v in entry.values():
-                if isinstance(v, list):
-                    parts.extend(str(x) for x in v)
-                else:
-                    parts.append(str(v))
-            blob = " ".join(parts).lower()
+    ROWS_TASK = "history.rows"
 
-            if query and query not in blob:
-                continue
+    def _render_rows(self, build):
+        """
+        Replace the list rows in time-sliced steps on the controller's task
+        runner: old rows are destroyed, then build (a generator adding one
+        row per step) runs. A newer render cancels an unfinished one. The
+        time from here to the last row is recorded as "refresh_list".
+        """
+        def steps():
+            for widget in self.list_frame.winfo_children():
+                widget.destroy()
+                yield
+            yield from build
+
+        t0 = time.perf_counter()
+
+        def done():
+            METRICS.observe("refresh_list", (time.perf_counter() - t0) * 1000.0)
+
+        visible = self.controller.pages.get(self.controller.current_page) is self
+        self.controller.tasks.submit(
+            steps(),
+            priority=ChunkedTaskRunner.PRIORITY_VISIBLE if visible else ChunkedTaskRunner.PRIORITY_BACKGROUND,
+            key=(self.ROWS_TASK, id(self)),
+            on_done=done,
+        )
 
-            ed = entry_date(entry)
-            if start_date and (ed is None or ed < start_date):
+    def _entry_rows(self, entries):
+        for i, entry in enumerate(entries):
+            self._add_entry_button(i, entry)
+            yield
+
+    def _add_entry_button(self, i, entry):
+        meds = entry.get("medications")
+        label_ts = entry.get("timestamp", "")
+        # prefer a user-provided title for list label if present
+        title = (entry.get("title") or "").strip()
+        if title:
+            label_text = title
+        elif meds and isinstance(meds, list) and meds:
+            first = meds[0]
+            first_name = first.get("name") if isinstance(first, RECORD_TYPES) else str(first)
+            label_text = first_name
+        else:
+            regimen = entry.get("regimen", "") or ""
+            label_text = regimen[:40]
+        btn_label = f"{label_ts} – {label_text[:40]}"
+        btn = ctk.CTkButton(
+            self.list_frame,
+            text=btn_label,
+            anchor="w",
+            command=lambda i=i: self.show_entry(i)
+        )
+        btn.pack(fill="x", pady=2)
+
+    LOAD_POLL_MS = 50
+
+    def _show_loading(self, loader, query, start_date, end_date):
+        """List the newest entries (filtered) while the full file is still being parsed."""
+        self._loader = loader
+        self._loading_label = None
+        self.display_entries = filter_entries(loader.preview, query, start_date, end_date)
+
+        def rows():
+            self._loading_label = ctk.CTkLabel(self.list_frame, text="Loading history…", anchor="w")
+            self._loading_label.pack(fill="x", pady=2)
+            yield
+            yield from self._entry_rows(self.display_entries)
+
+        self._render_rows(rows())
+        self.selected_index = None
+        self.detail_box.delete("1.0", "end")
+        self.detail_box.insert("1.0", "Loading history… the newest entries are listed while the rest is read.")
+        if getattr(self, "_load_poll", None) is None:
+            self._load_poll = self.after(self.LOAD_POLL_MS, self._poll_loader)
+
+    def _poll_loader(self):
+        self._load_poll = None
+        if self.controller.store.finish_background_load():
+            self.refresh_list()
+            return
+        try:
+            self._loading_label.configure(text=f"Loading history… {self._loader.count:,} entries read")
+        except Exception:
+            pass
+        self._load_poll = self.after(self.LOAD_POLL_MS, self._poll_loader)
+
+    @watched("check_doses")
+    def check_doses(self):
+        """Scan the whole history for doses far outside each medication's usual range."""
+        store = self.controller.store
+        found = store.dose_stats().outliers(store.entries())
+        self.selected_index = None
+        self.detail_box.delete("1.0", "end")
+        if not found:
+            self.detail_box.insert("1.0", "No unusual doses found.")
+            return
+        self.detail_box.insert(
+            "end",
+            f"{len(found)} dose(s) look unusual compared with the rest of your history.\n"
+            "They may be typos such as a missing decimal point:\n\n"
+        )
+        for f in sorted(found, key=lambda f: f["timestamp"], reverse=True):
+            self.detail_box.insert(
+                "end",
+                f"  - {f['timestamp']} | {f['name']} | {f['dose']} (usually about {f['typical']:.3g} {f['unit']})\n"
+            )
+
+    def _refresh_summary(self, query, start_text, end_text):
+        """List regimen epochs (runs of identical regimens) instead of single entries."""
+        self.display_entries = []
+        self.selected_index = None
+        self.display_epochs = []
+        for ep in reversed(self.controller.store.epochs()):
+            if start_text and ep["end"][:10] < start_text:
                 continue
-            if end_date and (ed is None or ed > end_date):
+            if end_text and ep["start"][:10] > end_text:
                 continue
+            if query and query not in " ".join(
+                f"{k} {v}" for k, v in ep["doses"].items()
+            ).lower():
+                continue
+            self.display_epochs.append(ep)
+        self._render_rows(self._epoch_rows(self.display_epochs))
 
-            i = len(self.display_entries)
-            self.display_entries.append(entry)
-            meds = entry.get("medications")
-            label_ts = entry.get("timestamp", "")
-            # prefer a user-provided title for list label if present
-            title = (entry.get("title") or "").strip()
-            if title:
-                label_text = title
-            elif meds and isinstance(meds, list) and meds:
-                first = meds[0]
-                first_name = first.get("name") if isinstance(first, dict) else str(first)
-                label_text = first_name
-            else:
-                regimen = entry.get("regimen", "") or ""
-                label_text = regimen[:40]
-            btn_label = f"{label_ts} – {label_text[:40]}"
+        self.detail_box.delete("1.0", "end")
+        if not self.display_epochs:
+            self.detail_box.insert("1.0", "No regimen periods match this filter.")
+        else:
+            self.detail_box.insert(
+                "1.0",
+                f"{len(self.display_epochs)} regimen periods. Select one to see details, "
+                "or turn off Summary to see individual entries."
+            )
+
+    def _epoch_rows(self, epochs):
+        for i, ep in enumerate(epochs):
+            meds = ", ".join(ep["medications"]) or "(no medications)"
             btn = ctk.CTkButton(
                 self.list_frame,
-                text=btn_label,
+                text=f"{ep['start'][:10]} → {ep['end'][:10]} ({ep['count']}) – {meds[:40]}",
                 anchor="w",
-                command=lambda i=i: self.show_entry(i)
+                command=lambda i=i: self.show_epoch(i)
             )
             btn.pack(fill="x", pady=2)
+            yield
 
-        if not self.display_entries:
-            self.detail_box.delete("1.0", "end")
-            self.detail_box.insert("1.0", "No entries match this filter.")
-            self.selected_index = None
-
+    def show_epoch(self, index):
+        try:
+            ep = self.display_epochs[index]
+        except Exception:
+            return
+        self.detail_box.delete("1.0", "end")
+        self.detail_box.insert("end", f"From: {ep['start']}\nTo: {ep['end']}\nEntries: {ep['count']}\n\n")
+        self.detail_box.insert("end", "Medications:\n")
+        for name in ep["medications"]:
+            dose = ep["doses"].get(name, "")
+            self.detail_box.insert("end", f"  - {name}" + (f" | {dose}" if dose else "") + "\n")
+
+    @timed("show_entry")
+    @watched("show_entry")
     def show_entry(self, index):
         try:
             entry = self.display_entries[index]
         except Exception:
             return
+        # the file may have changed since the list was built; re-read just this entry
+        if entry.get("id"):
+            try:
+                fresh = self.controller.store.read_entry(entry.get("id"))
+                if fresh is not None:
+                    entry = self.display_entries[index] = fresh
+            except Exception:
+                pass
 
         self.selected_index = index
         self.detail_box.delete("1.0", "end")
@@ -1128,7 +4523,7 @@ class HistoryPage(BasePage):
         if meds and isinstance(meds, list):
             self.detail_box.insert("end", "Medications:\n")
             for m in meds:
-                if isinstance(m, dict):
+                if isinstance(m, RECORD_TYPES):
                     line = f"  - {m.get('name','')}"
                     if m.get("dose"):
                         if m.get("unit"):
@@ -1153,18 +4548,15 @@ class HistoryPage(BasePage):
                 display_key = "Title" if key == "title" else key.capitalize()
                 self.detail_box.insert("end", f"{display_key}: {value}\n")
         for key, value in entry.items():
-            if key not in order and key != "medications":
+            if key not in order and key not in ("medications", "id"):
                 self.detail_box.insert("end", f"{key.capitalize()}: {value}\n")
 
+    @watched("delete_selected_entry")
     def delete_selected_entry(self):
         if self.selected_index is None or not getattr(self, "display_entries", None):
             messagebox.showinfo("No selection", "Select an entry to delete.")
             return
-        entries = load_entries()
-        entry_to_delete = self.display_entries[self.selected_index]
-        key = (entry_to_delete.get("timestamp"), entry_to_delete.get("regimen"))
-        idx = next((i for i, e in enumerate(entries)
-                    if (e.get("timestamp"), e.get("regimen")) == key), None)
+        idx = self.controller.store.position_of(self.display_entries[self.selected_index])
         if idx is None:
             messagebox.showerror("Delete failed", "Could not locate entry in data file.")
             return
@@ -1172,44 +4564,233 @@ class HistoryPage(BasePage):
             ok = messagebox.askyesno("Confirm delete", "Delete this entry?")
             if not ok:
                 return
-        del entries[idx]
-        save_entries(entries)
         self.selected_index = None
-        self.refresh_list()
+        # the store publishes "entries", which refreshes this (visible) page
+        if not self.controller.store.remove_at(idx):
+            return
         try:
             self.controller.show_status("Entry deleted.")
         except Exception:
             pass
 
+    @watched("duplicate_selected_entry")
     def duplicate_selected_entry(self):
         if self.selected_index is None or not getattr(self, "display_entries", None):
             messagebox.showinfo("No selection", "Select an entry to duplicate.")
             return
-        entries = load_entries()
         original = self.display_entries[self.selected_index]
         new_entry = dict(original)
+        new_entry.pop("id", None)
         new_entry["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        entries.append(new_entry)
-        save_entries(entries)
-        self.refresh_list()
+        if not self.controller.store.append(new_entry):
+            return
+        try:
+            self.controller.show_status("Entry duplicated.")
+        except Exception:
+            pass
+
+    def focus_first(self):
+        try:
+            if hasattr(self, "search_entry"):
+                self.search_entry.focus_set()
+                return
+        except Exception:
+            pass
+        super().focus_first()
+
+
+# ------------------------ Trends Page ------------------------
+
+class TrendsPage(BasePage):
+    """Dose-over-time chart backed by per-medication SeriesPyramid levels."""
+
+    depends_on = ("settings", "entries", "appearance")
+
+    MAX_POINTS = 2000
+    PAD = 48
+
+    def __init__(self, master, controller):
+        super().__init__(master, controller)
+
+        self.title_label = ctk.CTkLabel(self, font=("Arial", 24))
+        self.title_label.pack(pady=10)
+
+        top_row = ctk.CTkFrame(self)
+        top_row.pack(fill="x", padx=10, pady=5)
+        ctk.CTkLabel(top_row, text="Medication:").pack(side="left", padx=(6, 6))
+        self.med_menu = ctk.CTkOptionMenu(top_row, values=["(none)"], command=self._on_select_med)
+        self.med_menu.pack(side="left")
+        ctk.CTkButton(top_row, text="Reset zoom", width=110, command=self.reset_view).pack(side="left", padx=6)
+        self.info_label = ctk.CTkLabel(top_row, text="", anchor="e")
+        self.info_label.pack(side="right", padx=6)
+
+        self.report_box = ctk.CTkTextbox(self, height=200, wrap="word")
+        self.report_box.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+
+        self.canvas = ctk.CTkCanvas(self, highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<MouseWheel>", lambda e: self._zoom(e.x, 0.8 if e.delta > 0 else 1.25))
+        self.canvas.bind("<Button-4>", lambda e: self._zoom(e.x, 0.8))
+        self.canvas.bind("<Button-5>", lambda e: self._zoom(e.x, 1.25))
+
+        self._pyramids = {}
+        self._store_version = None
+        self._report_key = None
+        self._med = None
+        self._view = None
+        self._drag_x = None
+
+        self.refresh_language()
+
+    def show(self):
+        super().show()
+        self._sync_with_store()
+
+    def refresh_language(self):
+        self.title_label.configure(text="Trends")
+
+    def refresh_view(self, topics):
+        self.refresh_language()
+        self._sync_with_store()
+        if "appearance" in topics:
+            self.redraw()
+
+    def _sync_with_store(self):
+        store = self.controller.store
+        if self._report_key != store.data_key():
+            self._report_key = store.data_key()
+            self._show_report()
+        self._pyramids = store.derived("dose_pyramids", build_dose_pyramids)
+        if self._store_version == store.version:
+            return
+        self._store_version = store.version
+        names = sorted(self._pyramids, key=str.lower) or ["(none)"]
+        try:
+            self.med_menu.configure(values=names)
+        except Exception:
+            pass
+        if self._med not in self._pyramids:
+            self._med = names[0] if self._pyramids else None
+            self._view = None
         try:
-            self.controller.show_status("Entry duplicated.")
+            self.med_menu.set(self._med or "(none)")
         except Exception:
             pass
+        self.redraw()
 
-    def focus_first(self):
+    def _show_report(self):
         try:
-            if hasattr(self, "search_entry"):
-                self.search_entry.focus_set()
-                return
+            text = format_regimen_change_report(regimen_change_report(self.controller.store))
+        except Exception as e:
+            text = f"Could not analyze regimen changes:\n{e}"
+        try:
+            self.report_box.configure(state="normal")
+            self.report_box.delete("1.0", "end")
+            self.report_box.insert("1.0", "Regimen changes vs. mood and symptoms\n\n" + text)
+            self.report_box.configure(state="disabled")
         except Exception:
             pass
-        super().focus_first()
+
+    def _on_select_med(self, name):
+        self._med = name if name in self._pyramids else None
+        self._view = None
+        self.redraw()
+
+    def reset_view(self):
+        self._view = None
+        self.redraw()
+
+    def _current_view(self, pyr):
+        if self._view is None:
+            lo, hi = pyr.bounds()
+            if hi <= lo:
+                lo, hi = lo - 43200, hi + 43200
+            self._view = (lo, hi)
+        return self._view
+
+    def _on_press(self, event):
+        self._drag_x = event.x
+
+    def _on_drag(self, event):
+        if self._view is None or self._drag_x is None:
+            return
+        width = max(self.canvas.winfo_width() - 2 * self.PAD, 1)
+        x0, x1 = self._view
+        shift = (self._drag_x - event.x) * (x1 - x0) / width
+        self._view = (x0 + shift, x1 + shift)
+        self._drag_x = event.x
+        self.redraw()
+
+    def _zoom(self, px, factor):
+        if self._view is None:
+            return
+        width = max(self.canvas.winfo_width() - 2 * self.PAD, 1)
+        x0, x1 = self._view
+        frac = min(max((px - self.PAD) / width, 0.0), 1.0)
+        anchor = x0 + frac * (x1 - x0)
+        span = max((x1 - x0) * factor, 60.0)
+        self._view = (anchor - frac * span, anchor + (1 - frac) * span)
+        self.redraw()
+
+    def redraw(self):
+        c = self.canvas
+        try:
+            c.delete("all")
+            dark = ctk.get_appearance_mode() == "Dark"
+            c.configure(bg="#2b2b2b" if dark else "#f5f5f5")
+        except Exception:
+            return
+        fg = "#dce4ee" if dark else "#1a1a1a"
+        pyr = self._pyramids.get(self._med) if self._med else None
+        w, h = c.winfo_width(), c.winfo_height()
+        if not pyr or not len(pyr) or w < 2 * self.PAD or h < 2 * self.PAD:
+            self.info_label.configure(text="No dose data to chart yet." if not pyr else "")
+            return
+
+        x0, x1 = self._current_view(pyr)
+        xs, ys, level = pyr.window(x0, x1, self.MAX_POINTS)
+        if not xs:
+            self.info_label.configure(text="No data in this range.")
+            return
+        y_lo, y_hi = min(ys), max(ys)
+        if y_hi <= y_lo:
+            y_lo, y_hi = y_lo - 1, y_hi + 1
+        pw, ph = w - 2 * self.PAD, h - 2 * self.PAD
+
+        def sx(x):
+            return self.PAD + (x - x0) / (x1 - x0) * pw
+
+        def sy(y):
+            return h - self.PAD - (y - y_lo) / (y_hi - y_lo) * ph
+
+        c.create_rectangle(self.PAD, self.PAD, w - self.PAD, h - self.PAD, outline=fg)
+        coords = []
+        for x, y in zip(xs, ys):
+            coords.extend((sx(x), sy(y)))
+        if len(coords) >= 4:
+            c.create_line(*coords, fill="#1f6aa5", width=2)
+        else:
+            c.create_oval(coords[0] - 3, coords[1] - 3, coords[0] + 3, coords[1] + 3, fill="#1f6aa5", outline="")
+
+        c.create_text(self.PAD - 4, self.PAD, text=f"{y_hi:g}", anchor="e", fill=fg)
+        c.create_text(self.PAD - 4, h - self.PAD, text=f"{y_lo:g}", anchor="e", fill=fg)
+        for x, anchor in ((x0, "nw"), (x1, "ne")):
+            try:
+                label = datetime.fromtimestamp(x).strftime(self.controller.settings.get("date_format", "%Y-%m-%d"))
+            except Exception:
+                label = ""
+            c.create_text(sx(x), h - self.PAD + 4, text=label, anchor=anchor, fill=fg)
+        self.info_label.configure(text=f"{len(xs)} of {len(pyr)} points (level {level})")
 
 
 # ------------------------ Resources Page ------------------------
 
 class ResourcesPage(BasePage):
+    depends_on = ("settings", "resources")
+
     def __init__(self, master, controller):
         super().__init__(master, controller)
 
@@ -1282,6 +4863,13 @@ class ResourcesPage(BasePage):
             self.link_entry.configure(placeholder_text="URL or contact")
             self.tags_entry.configure(placeholder_text="Tags")
 
+    def refresh_view(self, topics):
+        if "settings" in topics:
+            self.refresh_language()
+        if "resources" in topics:
+            self.refresh_list()
+
+    @watched("resources.refresh_list")
     def refresh_list(self):
         for w in self.resource_list.winfo_children():
             w.destroy()
@@ -1320,6 +4908,7 @@ class ResourcesPage(BasePage):
         self.tags_entry.delete(0, "end")
         self.notes_box.delete("1.0", "end")
 
+    @watched("resources.save_current")
     def save_current(self):
         title = self.title_entry.get().strip()
         link = self.link_entry.get().strip()
@@ -1347,7 +4936,7 @@ class ResourcesPage(BasePage):
                 resources.append(item)
 
         save_resources(resources)
-        self.refresh_list()
+        self.controller.bus.publish("resources")
         messagebox.showinfo("Saved", "Resource saved.")
 
     def delete_selected(self):
@@ -1364,7 +4953,7 @@ class ResourcesPage(BasePage):
             save_resources(resources)
             self.selected_index = None
             self.new_resource()
-            self.refresh_list()
+            self.controller.bus.publish("resources")
             messagebox.showinfo("Deleted", "Resource deleted.")
 
     def open_link(self):
@@ -1392,6 +4981,112 @@ class ResourcesPage(BasePage):
 
 # ------------------------ Settings Page ------------------------
 
+class KeyedRowList:
+    """
+    Rows of a Settings list editor (label plus up/down/delete buttons),
+    keyed by item so sync() only touches what changed: a new item creates
+    one row, a removed item destroys one, and a move repacks just the rows
+    that are out of place. Callbacks receive the item's current index.
+    """
+
+    def __init__(self, container, on_move, on_delete, runner=None):
+        self.container = container
+        self.on_move = on_move
+        self.on_delete = on_delete
+        # with a ChunkedTaskRunner, schedule() spreads long syncs over slices
+        self.runner = runner
+        self.task_key = ("settings.rows", id(self))
+        self.rows = {}   # key -> row frame
+        self.order = []  # keys in packing order
+        self._target = []
+
+    @staticmethod
+    def _keys(items):
+        # (value, occurrence) so duplicate values still get distinct rows
+        seen = {}
+        keys = []
+        for it in items:
+            text = str(it)
+            seen[text] = seen.get(text, 0) + 1
+            keys.append((text, seen[text]))
+        return keys
+
+    def _index_of(self, key):
+        try:
+            return self.order.index(key)
+        except ValueError:
+            return None
+
+    def _make_row(self, key):
+        item_row = ctk.CTkFrame(self.container)
+        lbl = ctk.CTkLabel(item_row, text=key[0], anchor="w")
+        lbl.pack(side="left", fill="x", expand=True)
+        btns = ctk.CTkFrame(item_row)
+        btns.pack(side="right")
+        ctk.CTkButton(
+            btns, text="▲", width=36,
+            command=lambda k=key: self._clicked(k, self.on_move, -1)
+        ).pack(side="left", padx=(0, 4))
+        ctk.CTkButton(
+            btns, text="▼", width=36,
+            command=lambda k=key: self._clicked(k, self.on_move, 1)
+        ).pack(side="left", padx=(0, 4))
+        ctk.CTkButton(
+            btns, text="Delete", width=70,
+            command=lambda k=key: self._clicked(k, self.on_delete)
+        ).pack(side="left")
+        return item_row
+
+    def _clicked(self, key, callback, *args):
+        # finish an in-flight sync first so indexes match the settings list
+        if self.runner is not None and self.runner.pending(self.task_key):
+            self.runner.cancel(self.task_key)
+            self.sync(self._target)
+        idx = self._index_of(key)
+        if idx is not None:
+            callback(idx, *args)
+
+    def schedule(self, items):
+        """sync(items) on the task runner (or right away without one)."""
+        self._target = list(items)
+        if self.runner is None:
+            self.sync(self._target)
+        else:
+            self.runner.submit(self._sync_steps(self._target), key=self.task_key)
+
+    def sync(self, items):
+        self._target = list(items)
+        for _ in self._sync_steps(self._target):
+            pass
+
+    def _sync_steps(self, items):
+        """Generator doing one row operation per step; the state is consistent between steps."""
+        keys = self._keys(items)
+        wanted = set(keys)
+        for key in [k for k in self.order if k not in wanted]:
+            try:
+                self.rows.pop(key).destroy()
+            except Exception:
+                pass
+            self.order.remove(key)
+            yield
+        for i, key in enumerate(keys):
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = self._make_row(key)
+                if i < len(self.order):
+                    row.pack(fill="x", pady=2, padx=4, before=self.rows[self.order[i]])
+                else:
+                    row.pack(fill="x", pady=2, padx=4)
+                self.order.insert(i, key)
+                yield
+            elif self.order[i] != key:
+                row.pack_configure(before=self.rows[self.order[i]])
+                self.order.remove(key)
+                self.order.insert(i, key)
+                yield
+
+
 class SettingsPage(BasePage):
     DATE_FORMATS = [("YYYY-MM-DD", "%Y-%m-%d"), ("MM/DD/YYYY", "%m/%d/%Y"), ("DD/MM/YYYY", "%d/%m/%Y")]
     TIME_FORMATS = [("24-hour HH:MM", "%H:%M"), ("12-hour hh:MM AM/PM", "%I:%M %p")]
@@ -1435,6 +5130,7 @@ class SettingsPage(BasePage):
         self._build_list_editor(lists_frame, "regimens", "Regimens / Meds")
         self._build_list_editor(lists_frame, "routes", "Routes")
         self._build_list_editor(lists_frame, "units", "Dose units")
+        self._build_concentration_editor(lists_frame)
 
         defaults_frame = ctk.CTkFrame(self.lists_scroll)
         defaults_frame.pack(fill="x", padx=6, pady=(8, 6))
@@ -1547,7 +5243,6 @@ class SettingsPage(BasePage):
 
         self._list_editors = getattr(self, "_list_editors", {})
         self.refresh_settings_lists()
-        self._apply_appearance_and_theme()
 
     def _find_format_label(self, pattern, candidates):
         for label, pat in candidates:
@@ -1643,7 +5338,82 @@ class SettingsPage(BasePage):
         items_container.pack(fill="x", pady=(6, 0), padx=6)
         if not hasattr(self, "_list_editors"):
             self._list_editors = {}
-        self._list_editors[key] = {"entry": entry, "container": items_container}
+        self._list_editors[key] = {
+            "entry": entry,
+            "container": items_container,
+            "rows": KeyedRowList(
+                items_container,
+                on_move=lambda i, delta, k=key: self._move_list_item(k, i, delta),
+                on_delete=lambda i, k=key: self._delete_list_item(k, i),
+                runner=getattr(self.controller, "tasks", None),
+            ),
+        }
+
+    def _build_concentration_editor(self, parent):
+        """Editor for settings["concentrations"]: mg per ml used to convert ml doses to mg."""
+        frame = ctk.CTkFrame(parent)
+        frame.pack(fill="x", pady=6)
+        ctk.CTkLabel(frame, text="Concentrations (mg per ml, used to convert ml doses)").pack(anchor="w", padx=6)
+
+        row = ctk.CTkFrame(frame)
+        row.pack(fill="x", pady=(6, 0), padx=6)
+        self.conc_name_entry = ctk.CTkEntry(row, placeholder_text="Medication name")
+        self.conc_name_entry.pack(side="left", fill="x", expand=True, padx=(0, 6))
+        self.conc_value_entry = ctk.CTkEntry(row, width=100, placeholder_text="mg/ml")
+        self.conc_value_entry.pack(side="left", padx=(0, 6))
+        ctk.CTkButton(row, text="Set", width=80, command=self._set_concentration).pack(side="right")
+
+        self.conc_container = ctk.CTkFrame(frame)
+        self.conc_container.pack(fill="x", pady=(6, 0), padx=6)
+
+    def _refresh_concentrations(self):
+        items = sorted(self.controller.settings.get("concentrations", {}).items())
+        if items == getattr(self, "_shown_concentrations", None):
+            return
+        self._shown_concentrations = items
+        for w in self.conc_container.winfo_children():
+            w.destroy()
+        for name, value in items:
+            item_row = ctk.CTkFrame(self.conc_container)
+            item_row.pack(fill="x", pady=2, padx=4)
+            try:
+                shown = f"{float(value):g}"
+            except (TypeError, ValueError):
+                shown = str(value)
+            ctk.CTkLabel(item_row, text=f"{name}: {shown} mg/ml", anchor="w").pack(side="left", fill="x", expand=True)
+            ctk.CTkButton(
+                item_row, text="Delete", width=70,
+                command=lambda n=name: self._apply_concentrations(n, None)
+            ).pack(side="right")
+
+    def _set_concentration(self):
+        name = self.conc_name_entry.get().strip()
+        try:
+            value = float(self.conc_value_entry.get().strip().replace(",", "."))
+        except ValueError:
+            value = 0
+        if not name or value <= 0:
+            messagebox.showinfo("Concentration", "Enter a medication name and a positive mg/ml value.")
+            return
+        self.conc_name_entry.delete(0, "end")
+        self.conc_value_entry.delete(0, "end")
+        self._apply_concentrations(name, value)
+
+    def _apply_concentrations(self, name, value):
+        """Set (or remove, when value is None) one concentration and re-convert affected entries."""
+        conc = dict(self.controller.settings.get("concentrations", {}))
+        if value is None:
+            conc.pop(name, None)
+        else:
+            conc[name] = value
+        self.controller.settings["concentrations"] = conc
+        save_settings(self.controller.settings)
+        self._refresh_concentrations()
+        try:
+            changed = self.controller.store.set_concentrations(conc)
+            self.controller.show_status(f"Concentrations saved; {changed} entries re-converted.")
+        except Exception:
+            pass
 
     def _add_list_item(self, key, entry_widget):
         v = entry_widget.get().strip()
@@ -1659,7 +5429,7 @@ class SettingsPage(BasePage):
         entry_widget.delete(0, "end")
         self.refresh_settings_lists()
         try:
-            self.controller.refresh_all_pages()
+            self.controller.bus.publish("settings")
         except Exception:
             pass
 
@@ -1671,7 +5441,7 @@ class SettingsPage(BasePage):
             save_settings(self.controller.settings)
             self.refresh_settings_lists()
             try:
-                self.controller.refresh_all_pages()
+                self.controller.bus.publish("settings")
             except Exception:
                 pass
 
@@ -1687,57 +5457,44 @@ class SettingsPage(BasePage):
         save_settings(self.controller.settings)
         self.refresh_settings_lists()
         try:
-            self.controller.refresh_all_pages()
+            self.controller.bus.publish("settings")
         except Exception:
             pass
 
+    @watched("refresh_settings_lists")
     def refresh_settings_lists(self):
-        for key, ed in self._list_editors.items():
-            cont = ed["container"]
-            for w in cont.winfo_children():
-                w.destroy()
-            items = self.controller.settings.get(key, [])
-            for idx, it in enumerate(items):
-                item_row = ctk.CTkFrame(cont)
-                item_row.pack(fill="x", pady=2, padx=4)
-                lbl = ctk.CTkLabel(item_row, text=str(it), anchor="w")
-                lbl.pack(side="left", fill="x", expand=True)
-                btns = ctk.CTkFrame(item_row)
-                btns.pack(side="right")
-                up_btn = ctk.CTkButton(
-                    btns, text="▲", width=36,
-                    command=lambda k=key, i=idx: self._move_list_item(k, i, -1)
-                )
-                up_btn.pack(side="left", padx=(0, 4))
-                down_btn = ctk.CTkButton(
-                    btns, text="▼", width=36,
-                    command=lambda k=key, i=idx: self._move_list_item(k, i, 1)
-                )
-                down_btn.pack(side="left", padx=(0, 4))
-                del_btn = ctk.CTkButton(
-                    btns, text="Delete", width=70,
-                    command=lambda k=key, i=idx: self._delete_list_item(k, i)
-                )
-                del_btn.pack(side="left")
         try:
-            units = ["(none)"] + self.controller.settings.get("units", DEFAULT_DOSE_UNITS)
-            routes = ["(none)"] + self.controller.settings.get("routes", DEFAULT_ROUTE_OPTIONS)
-            try:
-                self.default_unit_menu.configure(values=units)
-                cur = self.controller.settings.get("default_unit", "(none)") or "(none)"
-                if cur not in units:
-                    cur = "(none)"
-                self.default_unit_menu.set(cur)
-            except Exception:
-                pass
+            self._refresh_concentrations()
+        except Exception:
+            pass
+        for key, ed in self._list_editors.items():
             try:
-                self.default_route_menu.configure(values=routes)
-                cur2 = self.controller.settings.get("default_route", "(none)") or "(none)"
-                if cur2 not in routes:
-                    cur2 = "(none)"
-                self.default_route_menu.set(cur2)
+                ed["rows"].schedule(self.controller.settings.get(key, []))
             except Exception:
                 pass
+        try:
+            units = ["(none)"] + self.controller.settings.get("units", DEFAULT_DOSE_UNITS)
+            routes = ["(none)"] + self.controller.settings.get("routes", DEFAULT_ROUTE_OPTIONS)
+            cur = self.controller.settings.get("default_unit", "(none)") or "(none)"
+            if cur not in units:
+                cur = "(none)"
+            cur2 = self.controller.settings.get("default_route", "(none)") or "(none)"
+            if cur2 not in routes:
+                cur2 = "(none)"
+            # the option menus are only touched when their values or selection changed
+            state = (units, routes, cur, cur2)
+            if state != getattr(self, "_shown_menu_state", None):
+                self._shown_menu_state = state
+                try:
+                    self.default_unit_menu.configure(values=units)
+                    self.default_unit_menu.set(cur)
+                except Exception:
+                    pass
+                try:
+                    self.default_route_menu.configure(values=routes)
+                    self.default_route_menu.set(cur2)
+                except Exception:
+                    pass
         except Exception:
             pass
 
@@ -1748,10 +5505,11 @@ class SettingsPage(BasePage):
             self.controller.reload_settings()
         except Exception:
             try:
-                self.controller.refresh_all_pages()
+                self.controller.bus.publish("settings")
             except Exception:
                 pass
 
+    @watched("apply_and_save")
     def apply_and_save(self):
         self.controller.settings["inclusive_language"] = self.inclusive_var.get()
         self.controller.settings["confirm_actions"] = self.confirm_var.get()
@@ -1770,7 +5528,7 @@ class SettingsPage(BasePage):
         except Exception:
             self._apply_appearance_and_theme()
             try:
-                self.controller.refresh_all_pages()
+                self.controller.bus.publish("settings")
             except Exception:
                 pass
         messagebox.showinfo("Settings", "Settings saved and applied.")
@@ -1795,9 +5553,15 @@ class SettingsPage(BasePage):
             "window_size": "1400x800",  # widened default
             "default_unit": "",
             "default_route": "",
-            "note_font_size": 12
+            "note_font_size": 12,
+            "concentrations": {}
         }
         save_settings(self.controller.settings)
+        try:
+            # re-convert entries logged with the removed concentrations, as saving one does
+            self.controller.store.set_concentrations({})
+        except Exception:
+            pass
         self.inclusive_var.set(True)
         self.confirm_var.set(True)
         self.seconds_var.set(True)
@@ -1811,7 +5575,7 @@ class SettingsPage(BasePage):
         self.refresh_settings_lists()
         self._apply_appearance_and_theme()
         try:
-            self.controller.refresh_all_pages()
+            self.controller.bus.publish("settings")
         except Exception:
             pass
         messagebox.showinfo("Reset", "Settings restored to defaults.")
@@ -1829,6 +5593,8 @@ class SettingsPage(BasePage):
 # ------------------------ Help Page ------------------------
 
 class HelpPage(BasePage):
+    depends_on = ()
+
     def __init__(self, master, controller):
         super().__init__(master, controller)
 
@@ -1848,8 +5614,10 @@ class HelpPage(BasePage):
             f"- Entries file: {DATA_FILE}\n"
             f"- Resources file: {RESOURCES_FILE}\n"
             f"- Settings file: {SETTINGS_FILE}\n\n"
-            "If any file becomes corrupted, the app will quietly rename it with a '.bak' extension "
-            "and start from a safe default so the program keeps working.\n\n"
+            "If your entries file is damaged, the app rebuilds your history from the best copy it can find,\n"
+            "keeps the damaged file as '.damaged-<date>' and tells you what was recovered (see section 7).\n"
+            "If the resources or settings file is damaged, it is renamed with a '.bak' extension and the app\n"
+            "starts from a safe default so the program keeps working.\n\n"
             "1. HRT Log Page\n"
             "----------------\n"
             "Use this page for day‑to‑day logging of what you take and how you feel.\n\n"
@@ -1858,9 +5626,13 @@ class HelpPage(BasePage):
             "- Date / Time fields:\n"
             "  • Date: Defaults to 'today' when you open the app, using the format chosen in Settings.\n"
             "  • Time: Defaults to 'now' when leaving it blank. Format also follows Settings (24‑hour or 12‑hour).\n"
+            "  • 📅 opens a calendar. Days you already logged are shaded green (darker = more entries),\n"
+            "    and the line under the grid counts the month's entries.\n"
             "  If parsing fails, the app shows an error and does not save the entry.\n\n"
             "- Medications list:\n"
             "  • Each row has: medication name, dose, dose unit, time for that dose, and route.\n"
+            "  • Typing a medication name suggests matches: names you log often and recently come first,\n"
+            "    then the built-in and Settings regimen suggestions. Use Up/Down and Return (or click).\n"
             "  • '+ Add medication' adds another row.\n"
             "  • 'Remove' removes a specific row.\n"
             "  • 'Unit' dropdown inserts a unit into the dose field (e.g. '2 mg').\n"
@@ -1899,6 +5671,8 @@ class HelpPage(BasePage):
             "Entry list and details:\n"
             "- Left side: A scrollable list of buttons, one per entry.\n"
             "  • Each button shows the timestamp and either the first medication or the regimen summary.\n"
+            "  • With a large history, the newest entries appear right away while the rest is read in\n"
+            "    the background; the list fills in once loading finishes.\n"
             "- Right side: A detailed text view for the selected entry.\n"
             "  • Shows a 'Medications:' section with each item's name, dose, unit, route, and per‑medication time.\n"
             "  • Shows fields like Mood, Symptoms, Notes, and any extra stored keys.\n\n"
@@ -1909,6 +5683,14 @@ class HelpPage(BasePage):
             "- 'Duplicate Entry':\n"
             "  • Copies the selected entry and assigns it a new timestamp set to the current time.\n"
             "  • This is useful for quickly logging repeated regimens with minor edits.\n\n"
+            "- 'Check Doses':\n"
+            "  • Lists doses that are far (3x or more) from what you usually log for that medication and unit.\n"
+            "  • The same check runs when saving on the HRT Log page and asks before saving an unusual dose.\n\n"
+            "Summary view:\n"
+            "- Turn on 'Summary' to list regimen periods instead of single entries.\n"
+            "  • Consecutive entries with the same medications and doses are grouped into one row\n"
+            "    showing the first and last date and how many entries it covers.\n"
+            "  • Date filters and search (medication names and doses) still apply.\n\n"
             "3. Resources Page\n"
             "------------------\n"
             "Use this page to store links, contacts, and notes about clinics, guides, or community resources.\n\n"
@@ -1947,7 +5729,12 @@ class HelpPage(BasePage):
             "  • Can include anything useful to you, such as 'Oral', 'IM', 'Patch', 'Sublingual', etc.\n"
             "- Dose units:\n"
             "  • Items appear in the 'Unit' dropdown for each medication row.\n"
-            "  • Examples: mg, mcg, units, ml, patches.\n\n"
+            "  • Examples: mg, mcg, units, ml, patches.\n"
+            "- Concentrations:\n"
+            "  • Set how many mg one ml of a medication contains (e.g. estradiol valerate 40 mg/ml).\n"
+            "  • Doses are stored with a converted value next to what you typed: mcg and g become mg,\n"
+            "    and ml becomes mg when a concentration is set. Charts and dose checks use these values.\n"
+            "  • Changing a concentration re-converts the affected entries once.\n\n"
             "Date / time and defaults:\n"
             "- Date format:\n"
             "  • Choose whether dates like today's appear as '2025-01-31', '01/31/2025', or '31/01/2025'.\n"
@@ -1990,11 +5777,23 @@ class HelpPage(BasePage):
             "  • This app does not sync or transmit your entries. Everything stays in JSON files locally.\n"
             "- Backup behavior:\n"
             "  • If 'Backup on save' is enabled, a '.bak' file is kept alongside each main JSON file.\n"
-            "  • If something goes wrong when loading a JSON file, the app renames it to '.bak' and "
-            "    starts from defaults so that it can still run.\n"
+            "  • If the entries file cannot be read, it is recovered rather than reset: see 'If the app closes\n"
+            "    unexpectedly while saving' in section 7.\n"
+            "  • If the resources or settings file cannot be read, the app renames it to '.bak' and starts\n"
+            "    from defaults so that it can still run.\n"
             "- Large histories:\n"
             "  • The app is designed for typical personal use. Very large history files may slow down "
-            "    filtering or loading slightly, but the JSON format remains the same.\n\n"
+            "    filtering or loading slightly, but the JSON format remains the same.\n"
+            "  • Each entry gets a short 'id' field, and 'hrt_entries.idx.json' records where each entry\n"
+            "    sits in the file so a single entry can be read without loading everything. The index is\n"
+            "    rebuilt automatically when the entries file changes and is safe to delete.\n"
+            "- Running more than one copy (e.g. Beta and Mini) on the same data folder:\n"
+            "  • Saves take a short-lived lock ('.lock' files next to the JSON files) and pick up entries the\n"
+            "    other copy saved first, so neither overwrites the other's entries.\n"
+            "  • If the other copy holds the lock for more than a few seconds, the save is refused with a\n"
+            "    message instead of waiting forever; just try again.\n"
+            "- Changes made outside the app (another copy, a sync tool, restoring a '.bak') are noticed\n"
+            "  automatically: History, Trends and Resources update and the status bar says what changed.\n\n"
             "7. Troubleshooting\n"
             "-------------------\n"
             "- If the app refuses to parse your date/time:\n"
@@ -2003,14 +5802,40 @@ class HelpPage(BasePage):
             "- If the window looks wrong after changing size or theme:\n"
             "  • Close and reopen the app; it will re‑apply window size and theme from Settings.\n"
             "  • You can always reset to defaults if something seems off.\n"
+            "- If the app is slow to start:\n"
+            "  • Launch it with '--profile-startup' (or set HRT_PROFILE_STARTUP=1) to write\n"
+            "    'startup_profile-<build>.json' to the data folder with the time spent in each startup phase.\n"
+            "  • Use '--profile-startup=cprofile' to also write a full cProfile dump ('.prof').\n"
+            "- If the window freezes or stutters while you work:\n"
+            "  • Turn on the watchdog on the Diagnostics page (or set HRT_WATCHDOG=1). It logs any action\n"
+            "    or event-loop stall longer than the threshold to 'hrt_diagnostics.log' in the data folder.\n"
+            "  • Turn on Metrics there (or set HRT_METRICS=1) to see p50/p95/p99 timings for loading, saving,\n"
+            "    list refreshes and exports; 'Dump JSON' saves them for a bug report.\n"
+            "- If the app closes unexpectedly while saving:\n"
+            "  • Every change to your history is first written to 'hrt_entries.wal'. On the next start the\n"
+            "    app reapplies any change that did not make it into 'hrt_entries.json' and tells you so.\n"
+            "  • If 'hrt_entries.json' itself is damaged, the app rebuilds it from the newest complete copy\n"
+            "    (the temp file, the '.bak' backup or the readable part of the damaged file), keeps the damaged\n"
+            "    file as '.damaged-<date>' and shows what was recovered; it never starts over with an empty history.\n"
             "- If JSON files become corrupted:\n"
-            "  • The app automatically renames problematic files to '.bak' and recreates new ones.\n"
-            "  • You can open the '.bak' files in a text editor if you need to manually rescue old data.\n\n"
+            "  • Entries: recovered as described above, with a message listing where the history came from,\n"
+            "    how many unsaved changes were reapplied and where the damaged copy was kept.\n"
+            "  • Resources and settings: the damaged file is renamed to '.bak' and a new one is created.\n"
+            "  • You can open the '.bak' or '.damaged-<date>' files in a text editor to rescue old data by hand.\n\n"
             "8. Personalization Tips\n"
             "------------------------\n"
             "- Use custom regimens for common patterns (e.g. 'Evening oral estradiol' or 'Weekly injection').\n"
             "- Use tags on Resources to quickly group clinics, guides, community spaces, and legal help.\n"
             "- Adjust the notes font size to what feels comfortable for extended journaling.\n"
+            "\n9. Trends Page\n"
+            "---------------\n"
+            "- Pick a medication to chart its logged doses over time.\n"
+            "  • Scroll to zoom around the mouse pointer, drag to pan, 'Reset zoom' to see everything.\n"
+            "  • Long histories are drawn from pre-built summary levels that keep every peak and dip visible,\n"
+            "    so zooming and panning stay quick even with years of entries.\n"
+            "- The box below the chart lists each regimen change (medication added or stopped, dose changed)\n"
+            "  with mood shares and symptom words before vs. after the change.\n"
+            "  • Results are cached next to your data, so reopening the page is instant until entries change.\n"
             "\nKeyboard shortcuts\n"
             "------------------\n"
             "- Ctrl+1: HRT Log\n"
@@ -2020,8 +5845,17 @@ class HelpPage(BasePage):
             "- Ctrl+5: Help\n"
             "- Ctrl+6: Report a Bug\n"
             "- Ctrl+7: Contribute\n"
+            "- Ctrl+8: Trends\n"
+            "- Ctrl+9: Diagnostics\n"
             "- Left / Right arrow: cycle previous / next page\n"
             "- Ctrl+S: context-aware quick save (saves entry, resource, settings, bug report or plan depending on page)\n\n"
+            "Launch options\n"
+            "--------------\n"
+            "- Only one window runs at a time. Launching the app again brings the open window to the front\n"
+            "  instead of starting a second copy that could overwrite the same files.\n"
+            "- --page NAME: open a page, e.g. 'hrt-tracker --page History'.\n"
+            "- --quick-log: open HRT Log with the current date and time filled in.\n"
+            "- --new-instance (or HRT_MULTI_INSTANCE=1): start a separate window anyway.\n\n"
         )
 
         self.text_box = ctk.CTkTextbox(self, wrap="word", width=800, height=500)
@@ -2035,6 +5869,8 @@ class HelpPage(BasePage):
 
 # REPLACEMENT: simplified Bug report page with a reusable template and actions
 class BugReportPage(BasePage):
+    depends_on = ()
+
     def __init__(self, master, controller):
         super().__init__(master, controller)
         ctk.CTkLabel(self, text="Report a Bug", font=("Arial", 20)).pack(pady=12)
@@ -2169,6 +6005,8 @@ class BugReportPage(BasePage):
 
 # NEW: Contribution page (guidelines + save a local plan)
 class ContributionPage(BasePage):
+    depends_on = ()
+
     def __init__(self, master, controller):
         super().__init__(master, controller)
         ctk.CTkLabel(self, text="Contribute / Get Involved", font=("Arial", 20)).pack(pady=10)
@@ -2230,14 +6068,163 @@ class ContributionPage(BasePage):
         super().focus_first()
 
 
+class DiagnosticsPage(BasePage):
+    depends_on = ()
+
+    def __init__(self, master, controller):
+        super().__init__(master, controller)
+        ctk.CTkLabel(self, text="Diagnostics", font=("Arial", 20)).pack(pady=10)
+        info = (
+            "Metrics time loading, saving, list refreshes and exports (percentiles per operation).\n"
+            "The watchdog logs actions and event-loop stalls that take longer than the threshold,\n"
+            f"so sluggish spots can be reported. Watchdog records are also written to:\n{DIAGNOSTICS_LOG_FILE}"
+        )
+        ctk.CTkLabel(self, text=info, justify="left").pack(padx=12, anchor="w")
+
+        mrow = ctk.CTkFrame(self)
+        mrow.pack(fill="x", padx=12, pady=(6, 0))
+        self.metrics_var = ctk.BooleanVar(value=METRICS.enabled)
+        ctk.CTkSwitch(mrow, text="Metrics", variable=self.metrics_var,
+                      command=self.toggle_metrics).pack(side="left")
+        ctk.CTkButton(mrow, text="Reset", width=90, command=self.reset_metrics).pack(side="left", padx=(12, 0))
+        ctk.CTkButton(mrow, text="Dump JSON", width=110, command=self.dump_metrics).pack(side="left", padx=(6, 0))
+
+        self.metrics_box = ctk.CTkTextbox(self, wrap="none", height=200)
+        self.metrics_box.pack(fill="x", padx=12, pady=(6, 0))
+
+        row = ctk.CTkFrame(self)
+        row.pack(fill="x", padx=12, pady=(6, 6))
+        self.watchdog_var = ctk.BooleanVar(value=WATCHDOG is not None)
+        ctk.CTkSwitch(row, text="Watchdog", variable=self.watchdog_var,
+                      command=self.toggle_watchdog).pack(side="left")
+        ctk.CTkLabel(row, text="Threshold (ms):").pack(side="left", padx=(12, 4))
+        self.threshold_entry = ctk.CTkEntry(row, width=70)
+        self.threshold_entry.insert(0, str(controller.settings.get("watchdog_threshold_ms", 200)))
+        self.threshold_entry.pack(side="left")
+        ctk.CTkButton(row, text="Refresh", width=90, command=self.refresh_all).pack(side="left", padx=(12, 0))
+        ctk.CTkButton(row, text="Clear", width=90, command=self.clear_records).pack(side="left", padx=(6, 0))
+
+        self.records_box = ctk.CTkTextbox(self, wrap="none", height=200)
+        self.records_box.pack(fill="both", expand=True, padx=12, pady=(0, 12))
+        self.refresh_records()
+
+    def toggle_metrics(self):
+        METRICS.enabled = bool(self.metrics_var.get())
+        self.controller.settings["diagnostics_metrics"] = METRICS.enabled
+        save_settings(self.controller.settings)
+        self.refresh_metrics()
+
+    def reset_metrics(self):
+        METRICS.reset()
+        self.refresh_metrics()
+
+    def dump_metrics(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile=f"hrt_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            filetypes=[("JSON files", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            METRICS.dump(path)
+            self.controller.show_status(f"Metrics written to {path}")
+        except Exception as e:
+            messagebox.showerror("Dump failed", str(e))
+
+    def refresh_metrics(self):
+        snap = METRICS.snapshot()
+        lines = [
+            f"File saves: {WRITE_STATS['written']} written, "
+            f"{WRITE_STATS['skipped']} skipped because nothing changed.",
+            "",
+        ]
+        if not METRICS.enabled:
+            lines.append("Metrics are off (values below are from when they were on).")
+        lines.append(f"{'operation':<24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+
+        def fmt(v):
+            return f"{v:>10.2f}" if v is not None else f"{'-':>10}"
+
+        for name, st in snap["latency"].items():
+            lines.append(
+                f"{name:<24}{st['count']:>8}{fmt(st['p50_ms'])}{fmt(st['p95_ms'])}"
+                f"{fmt(st['p99_ms'])}{fmt(st['max_ms'])}"
+            )
+        if snap["counters"]:
+            lines.append("")
+            for name, value in snap["counters"].items():
+                lines.append(f"{name:<24}{value:>8}")
+        self.metrics_box.configure(state="normal")
+        self.metrics_box.delete("1.0", "end")
+        self.metrics_box.insert("1.0", "\n".join(lines))
+        self.metrics_box.configure(state="disabled")
+
+    def toggle_watchdog(self):
+        enabled = bool(self.watchdog_var.get())
+        try:
+            threshold = max(1, int(self.threshold_entry.get().strip()))
+        except Exception:
+            threshold = 200
+        self.controller.settings["watchdog_threshold_ms"] = threshold
+        self.controller.settings["diagnostics_watchdog"] = enabled
+        # restart so a changed threshold takes effect
+        self.controller.set_watchdog(False)
+        if enabled:
+            self.controller.set_watchdog(True)
+        save_settings(self.controller.settings)
+        self.refresh_records()
+        try:
+            self.controller.show_status("Watchdog on." if enabled else "Watchdog off.")
+        except Exception:
+            pass
+
+    def refresh_records(self):
+        lines = []
+        if WATCHDOG is None:
+            lines.append("Watchdog is off.")
+        else:
+            lines.append(f"Threshold: {WATCHDOG.threshold_ms:.0f} ms    worst lag seen: {WATCHDOG.max_lag_ms:.0f} ms")
+            lines.append("")
+            for rec in reversed(WATCHDOG.records):
+                lines.append(f"{rec['time']}  {rec['kind']:<16} {rec['duration_ms']:>8.1f} ms  {rec['command']}")
+            if not WATCHDOG.records:
+                lines.append("No slow actions recorded yet.")
+        self.records_box.configure(state="normal")
+        self.records_box.delete("1.0", "end")
+        self.records_box.insert("1.0", "\n".join(lines))
+        self.records_box.configure(state="disabled")
+
+    def clear_records(self):
+        if WATCHDOG is not None:
+            WATCHDOG.records.clear()
+            WATCHDOG.max_lag_ms = 0.0
+        self.refresh_records()
+
+    def refresh_all(self):
+        self.refresh_metrics()
+        self.refresh_records()
+
+    def show(self):
+        super().show()
+        self.refresh_all()
+
+    def refresh_language(self):
+        pass
+
+
 # ------------------------ Main App ------------------------
 
 class HRTTrackerApp(ctk.CTk):
     def __init__(self):
+        STARTUP.mark("module setup")
         super().__init__()
+        STARTUP.mark("create Tk root")
 
         self.title("HRT Tracker")
+        self.bus = InvalidationBus()
         self.settings = load_settings()
+        STARTUP.mark("load_settings")
 
         try:
             self.apply_theme(
@@ -2246,6 +6233,7 @@ class HRTTrackerApp(ctk.CTk):
             )
         except Exception:
             pass
+        STARTUP.mark("apply_theme")
 
         # apply geometry snapped to top-left of current screen (falls back to 0,0)
         try:
@@ -2255,6 +6243,7 @@ class HRTTrackerApp(ctk.CTk):
                 self.geometry(self.settings.get("window_size", "1400x800"))
             except Exception:
                 self.geometry("1400x800")
+        STARTUP.mark("set_window_geometry_top_left")
 
         self.sidebar = ctk.CTkFrame(self, width=200)
         self.sidebar.pack(side="left", fill="y")
@@ -2271,13 +6260,35 @@ class HRTTrackerApp(ctk.CTk):
         status_bar = ctk.CTkLabel(main_frame, textvariable=self.status_var, anchor="w")
         status_bar.pack(side="bottom", fill="x")
 
+        self.tasks = ChunkedTaskRunner(self)
+        self.store = EntryStore(bus=self.bus)
+        self.store.on_recovery = self._report_recovery
+        self._seed_medication_suggestions()
+        self.bus.subscribe("settings", lambda topic: self._seed_medication_suggestions())
+        self.store.set_concentrations(self.settings.get("concentrations", {}), renormalize=False)
+
+        # pick up edits other programs make to the data files
+        self.watcher = DataFileWatcher(self, {
+            DATA_FILE: self._on_entries_file_changed,
+            SETTINGS_FILE: lambda path: self.reload_settings(),
+            RESOURCES_FILE: lambda path: self.bus.publish("resources"),
+        })
+        try:
+            self.watcher.start()
+        except Exception:
+            pass
+
         self.pages = {}
+        self.current_page = None
+        # pages are built on first show; add_page only registers a factory
+        self.page_factories = {}
         # NEW: track order of pages for left/right cycling and numeric shortcuts
         self.page_order = []
 
         # register pages (kept same order as before)
         self.add_page("HRT Log", HRTLogPage)
         self.add_page("History", HistoryPage)
+        self.add_page("Trends", TrendsPage)
         self.add_page("Resources", ResourcesPage)
         self.add_page("Settings", SettingsPage)
         self.add_page("Help", HelpPage)
@@ -2285,6 +6296,14 @@ class HRTTrackerApp(ctk.CTk):
         # NEW: register the new pages in the sidebar
         self.add_page("Report a Bug", BugReportPage)
         self.add_page("Contribute", ContributionPage)
+        self.add_page("Diagnostics", DiagnosticsPage)
+
+        STARTUP.mark("layout and sidebar")
+
+        if self.settings.get("diagnostics_metrics"):
+            METRICS.enabled = True
+        if self.settings.get("diagnostics_watchdog") or os.environ.get("HRT_WATCHDOG"):
+            self.set_watchdog(True)
 
         # NEW: bind keyboard shortcuts and on-close handler (safe)
         try:
@@ -2295,13 +6314,52 @@ class HRTTrackerApp(ctk.CTk):
             self.protocol("WM_DELETE_WINDOW", self._on_close)
         except Exception:
             pass
+        # pause page timers (e.g. the HRT Log clock) while minimized
+        try:
+            self.bind("<Unmap>", self._on_window_unmap, add="+")
+            self.bind("<Map>", self._on_window_map, add="+")
+        except Exception:
+            pass
 
         self.show_page("HRT Log")
 
+        try:
+            self.after_idle(self._on_first_frame)
+        except Exception:
+            pass
+
+    PREWARM_DELAY_MS = 300
+
+    def _on_first_frame(self):
+        STARTUP.mark("first frame")
+        STARTUP.write()
+        # build the remaining pages one at a time once the first frame is on screen
+        if self.settings.get("prewarm_pages", True):
+            try:
+                self.after(self.PREWARM_DELAY_MS, self._prewarm_next_page)
+            except Exception:
+                pass
+
     # updated add_page with safety and ordering
     def add_page(self, name, page_class):
+        """Register a page and its sidebar button; the page itself is built on first show."""
+        self.page_factories[name] = page_class
+        self.page_order.append(name)
+
+        btn = ctk.CTkButton(self.sidebar, text=name, command=lambda n=name: self.show_page(n))
+        btn.pack(pady=5, fill="x")
+
+    def _ensure_page(self, name):
+        """Return the page for name, constructing it (below the visible page) if needed."""
+        page = self.pages.get(name)
+        if page is not None:
+            return page
+        page_class = self.page_factories.get(name)
+        if page_class is None:
+            return None
         try:
-            page = page_class(self.container, self)
+            with STARTUP.phase(f"build page: {name}"):
+                page = page_class(self.container, self)
         except Exception as e:
             # create a minimal fallback page to avoid crashing the sidebar creation
             fallback = ctk.CTkFrame(self.container)
@@ -2309,19 +6367,45 @@ class HRTTrackerApp(ctk.CTk):
             lbl.pack(fill="both", expand=True, padx=12, pady=12)
             page = fallback
         page.place(relwidth=1, relheight=1)
+        # newly placed frames stack on top; keep whatever is showing visible
+        page.lower()
         self.pages[name] = page
-        self.page_order.append(name)
+        return page
 
-        btn = ctk.CTkButton(self.sidebar, text=name, command=lambda n=name: self.show_page(n))
-        btn.pack(pady=5, fill="x")
+    def _prewarm_next_page(self):
+        """Idle-time construction of one not-yet-built page per call."""
+        for name in self.page_order:
+            if name not in self.pages:
+                try:
+                    self._ensure_page(name)
+                except Exception:
+                    pass
+                try:
+                    self.after(50, self._prewarm_next_page)
+                except Exception:
+                    pass
+                return
+        # all pages built: rewrite the startup report so it includes prewarm phases
+        STARTUP.write()
 
+    @watched("show_page")
     def show_page(self, name):
         # safe show
         try:
-            p = self.pages.get(name)
+            p = self._ensure_page(name)
             if not p:
                 return
+            prev = self.pages.get(self.current_page)
+            if prev is not None and prev is not p:
+                try:
+                    prev.on_hide()
+                except Exception:
+                    pass
+            self.current_page = name
             p.show()
+            # hidden pages only mark themselves dirty; catch up now
+            if hasattr(p, "refresh_if_dirty"):
+                p.refresh_if_dirty()
             # focus first useful widget for keyboard traversal
             try:
                 if hasattr(p, "focus_first"):
@@ -2335,15 +6419,31 @@ class HRTTrackerApp(ctk.CTk):
         except Exception:
             pass
 
+    def _on_window_unmap(self, event):
+        # child widgets' Map/Unmap events also reach the root binding
+        if event.widget is not self:
+            return
+        page = self.pages.get(self.current_page)
+        if page is not None:
+            try:
+                page.on_hide()
+            except Exception:
+                pass
+
+    def _on_window_map(self, event):
+        if event.widget is not self:
+            return
+        page = self.pages.get(self.current_page)
+        if page is not None:
+            try:
+                page.show()
+            except Exception:
+                pass
+
     # NEW: helper to perform context-aware save on Ctrl+S
     def _do_quick_save(self):
         try:
-            current = None
-            # find visible page name
-            for name, page in self.pages.items():
-                if str(page) and page.winfo_ismapped():
-                    current = name
-                    break
+            current = self.current_page
             if current is None:
                 return
             if current == "HRT Log":
@@ -2390,14 +6490,10 @@ class HRTTrackerApp(ctk.CTk):
         try:
             if not self.page_order:
                 return
-            # find current page name by visible mapping; fall back to index 0
-            current = None
-            for i, name in enumerate(self.page_order):
-                p = self.pages.get(name)
-                if p and p.winfo_ismapped():
-                    current = i
-                    break
-            if current is None:
+            # fall back to index 0 if no page was shown yet
+            try:
+                current = self.page_order.index(self.current_page)
+            except ValueError:
                 current = 0
             new_index = (current + delta) % len(self.page_order)
             self.show_page(self.page_order[new_index])
@@ -2407,7 +6503,7 @@ class HRTTrackerApp(ctk.CTk):
     # NEW: bind keyboard shortcuts
     def _bind_shortcuts(self):
         try:
-            # numeric shortcuts Ctrl+1..7
+            # numeric shortcuts Ctrl+1..9
             def bind_num(n, page_name):
                 try:
                     self.bind_all(f"<Control-Key-{n}>", lambda e, nm=page_name: self.show_page(nm))
@@ -2421,7 +6517,9 @@ class HRTTrackerApp(ctk.CTk):
                 "4": "Settings",
                 "5": "Help",
                 "6": "Report a Bug",
-                "7": "Contribute"
+                "7": "Contribute",
+                "8": "Trends",
+                "9": "Diagnostics"
             }
             for k, v in mappings.items():
                 bind_num(k, v)
@@ -2441,54 +6539,155 @@ class HRTTrackerApp(ctk.CTk):
 
     def _focus_history_search(self):
         try:
-            page = self.pages.get("History")
+            page = self._ensure_page("History")
             if page and hasattr(page, "search_entry"):
                 page.search_entry.focus_set()
         except Exception:
             pass
 
-    # NEW: on-close handler persist settings and exit cleanly
-    def _on_close(self):
+    def set_watchdog(self, enabled):
+        """Start or stop the event-loop LagMonitor (see Diagnostics page)."""
+        global WATCHDOG
+        if enabled and WATCHDOG is None:
+            try:
+                threshold = float(self.settings.get("watchdog_threshold_ms", 200))
+            except Exception:
+                threshold = 200.0
+            WATCHDOG = LagMonitor(self, threshold_ms=threshold, log_path=DIAGNOSTICS_LOG_FILE)
+            WATCHDOG.start()
+        elif not enabled and WATCHDOG is not None:
+            WATCHDOG.stop()
+            WATCHDOG = None
+
+    # ------------------------ launch requests ------------------------
+    INSTANCE_POLL_MS = 1000
+
+    def handle_launch_request(self, request):
+        """Apply --page / --quick-log from this launch or one handed over by a later launch."""
         try:
-            save_settings(self.settings)
+            if request.get("quick_log"):
+                self.show_page("HRT Log")
+                self.pages["HRT Log"].start_quick_log()
+                return
+            wanted = (request.get("page") or "").strip().lower()
+            for name in self.page_order:
+                if name.lower() == wanted:
+                    self.show_page(name)
+                    return
         except Exception:
             pass
-        try:
-            self.destroy()
-        except Exception:
+
+    def attach_instance(self, server):
+        """Take launch requests from later launches (see InstanceServer)."""
+        self.instance = server
+        if server.wake_fd is not None:
             try:
-                self.quit()
+                # woken by the server thread's pipe; no timer while idle
+                self.tk.createfilehandler(server.wake_fd, tkinter.READABLE,
+                                          lambda fd, mask: self._take_instance_requests())
+                return
             except Exception:
                 pass
+        # Windows: Tk cannot watch sockets or pipes there, so poll slowly
+        try:
+            self.after(self.INSTANCE_POLL_MS, self._poll_instance)
+        except Exception:
+            pass
 
-    def apply_theme(self, appearance=None, color_theme=None):
+    def _poll_instance(self):
+        if getattr(self, "instance", None) is None:
+            return
+        self._take_instance_requests()
         try:
-            if (appearance):
-                try:
-                    ctk.set_appearance_mode(appearance)
-                except Exception:
-                    pass
+            self.after(self.INSTANCE_POLL_MS, self._poll_instance)
         except Exception:
             pass
 
-        def _refresh(widget):
+    def _take_instance_requests(self):
+        server = getattr(self, "instance", None)
+        if server is None:
+            return
+        for request in server.poll():
             try:
-                widget.update_idletasks()
+                self.deiconify()
+                self.lift()
+                self.focus_force()
             except Exception:
                 pass
-            for child in widget.winfo_children():
-                _refresh(child)
+            self.handle_launch_request(request)
+
+    def _seed_medication_suggestions(self):
+        """Regimen names autocomplete offers before they are logged; reseeded when settings change."""
+        seeds = list(DEFAULT_REGIMEN_SUGGESTIONS) + list(self.settings.get("regimens", []))
+        self.store.set_medication_suggestions(n for n in seeds if n != "Other")
+
+    def _report_recovery(self, report):
+        """Tell the user what crash recovery restored (EntryStore.on_recovery)."""
+        lines = [f"Your history was restored from the {report['source']} ({report['entries']} entries)."]
+        if report.get("replayed"):
+            lines.append(f"{report['replayed']} unsaved change(s) from the last session were reapplied.")
+        if report.get("torn_tail"):
+            lines.append("A change that was being written when the app stopped was incomplete and was skipped.")
+        if report.get("damaged_copy"):
+            lines.append(f"The damaged file was kept as:\n{report['damaged_copy']}")
+        lines.append(f"History now has {report['total']} entries.")
+        try:
+            self.show_status(f"Recovered history: {report['total']} entries.")
+        except Exception:
+            pass
+        try:
+            self.after_idle(lambda: messagebox.showinfo("History recovered", "\n\n".join(lines)))
+        except Exception:
+            pass
+
+    def _on_entries_file_changed(self, path):
+        result = self.store.apply_external_change()
+        if result:
+            added, removed, changed = result
+            self.show_status(f"Entries updated from disk: {added} added, {removed} removed, {changed} changed.")
 
+    # NEW: on-close handler persist settings and exit cleanly
+    def _on_close(self):
         try:
-            _refresh(self)
+            self.watcher.stop()
         except Exception:
             pass
         try:
-            for page in self.pages.values():
-                try:
-                    _refresh(page)
-                except Exception:
-                    pass
+            save_settings(self.settings)
+        except Exception:
+            pass
+        try:
+            if getattr(self, "instance", None) is not None:
+                if self.instance.wake_fd is not None:
+                    self.tk.deletefilehandler(self.instance.wake_fd)
+                self.instance.close()
+                self.instance = None
+        except Exception:
+            pass
+        try:
+            self.destroy()
+        except Exception:
+            try:
+                self.quit()
+            except Exception:
+                pass
+
+    def apply_theme(self, appearance=None, color_theme=None):
+        """
+        Switch the appearance mode. CustomTkinter widgets recolor themselves
+        through its appearance tracker, so no widget tree walk is needed; the
+        "appearance" topic is published for pages that draw with plain Tk
+        (e.g. the Trends canvas). Nothing happens if the mode is unchanged.
+        """
+        if not appearance or appearance == getattr(self, "_applied_appearance", None):
+            return
+        try:
+            ctk.set_appearance_mode(appearance)
+            self._applied_appearance = appearance
+        except Exception:
+            return
+        try:
+            self.bus.publish("appearance")
         except Exception:
             pass
 
@@ -2516,6 +6715,7 @@ class HRTTrackerApp(ctk.CTk):
                 self.geometry(self.settings.get("window_size", "1400x800"))
             except Exception:
                 self.geometry("1400x800")
+        self._applied_window_size = self.settings.get("window_size", "1400x800")
 
     def reload_settings(self):
         try:
@@ -2523,38 +6723,34 @@ class HRTTrackerApp(ctk.CTk):
         except Exception:
             return
 
-        try:
-            self.apply_theme(
-                self.settings.get("appearance", "System"),
-                None
-            )
-        except Exception:
-            pass
+        # theme and geometry are only reapplied when they actually changed
+        if self.settings.get("appearance", "System") != getattr(self, "_applied_appearance", None):
+            try:
+                self.apply_theme(
+                    self.settings.get("appearance", "System"),
+                    None
+                )
+            except Exception:
+                pass
 
-        try:
-            # reapply snapped-to-monitor geometry
-            self.set_window_geometry_top_left()
-        except Exception:
-            pass
+        if self.settings.get("window_size", "1400x800") != getattr(self, "_applied_window_size", None):
+            try:
+                # reapply snapped-to-monitor geometry
+                self.set_window_geometry_top_left()
+            except Exception:
+                pass
 
         try:
-            for page in self.pages.values():
-                page.controller.settings = self.settings
+            self.store.set_concentrations(self.settings.get("concentrations", {}))
         except Exception:
             pass
 
-        try:
-            self.refresh_all_pages()
-        except Exception:
-            pass
+        self.bus.publish("settings")
 
     def refresh_all_pages(self):
-        for page in self.pages.values():
-            try:
-                if hasattr(page, "refresh_language"):
-                    page.refresh_language()
-            except Exception:
-                pass
+        """Mark every page out of date; the visible one refreshes now, the rest on next show."""
+        for topic in ("settings", "entries", "resources"):
+            self.bus.publish(topic)
 
     def show_status(self, text, duration_ms=3000):
         try:
@@ -2581,6 +6777,13 @@ class HRTTrackerApp(ctk.CTk):
 
 if __name__ == "__main__":
     app = HRTTrackerApp()
-    app.mainloop()
+    app.handle_launch_request(LAUNCH_REQUEST)
+    if INSTANCE is not None:
+        app.attach_instance(INSTANCE)
+    try:
+        app.mainloop()
+    finally:
+        if INSTANCE is not None:
+            INSTANCE.close()
 
 
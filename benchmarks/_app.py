@@ -0,0 +1,59 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The tracker is a single script with a hyphenated file name, so it is
+loaded by path. Every benchmark points APPDATA at a throwaway directory
+before loading it, so real user data is never read or written.
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUILDS = {
+    "beta": REPO_ROOT / "HRT Tracker Beta" / "hrt-tracker.py",
+    "mini": REPO_ROOT / "HRT Tracker Mini" / "hrt-tracker.py",
+}
+
+
+def app_path(build_or_path):
+    """Resolve "beta" / "mini" or an explicit path to the tracker script."""
+    return Path(BUILDS.get(str(build_or_path).lower(), build_or_path)).resolve()
+
+
+def isolate_app_data(data_dir=None):
+    """Point the tracker's APP_DATA_DIR at data_dir (a new temp dir by default)."""
+    data_dir = str(data_dir or tempfile.mkdtemp(prefix="hrt-bench-"))
+    os.environ["APPDATA"] = data_dir
+    os.environ.pop("LOCALAPPDATA", None)
+    return Path(data_dir) / "HRT Tracker"
+
+
+def require_display(what):
+    """Exit with a clear message when Tk cannot open a window (no display)."""
+    import tkinter
+    try:
+        root = tkinter.Tk()
+        root.destroy()
+    except tkinter.TclError as e:
+        sys.exit(f"{what} needs a display and none is available ({e}); "
+                 "run it on a desktop session or under xvfb-run.")
+
+
+def settle(app):
+    """Process events until the app's ChunkedTaskRunner has built every row."""
+    app.update()
+    while app.tasks.busy():
+        app.update()
+
+
+def load_app(build_or_path="beta", module_name="hrt_tracker"):
+    """Import the tracker script as a module without starting the UI."""
+    path = app_path(build_or_path)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
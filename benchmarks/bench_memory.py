@@ -0,0 +1,68 @@
+"""
+Memory used by the in-memory entries list (headless, no Tk windows).
+
+Writes a synthetic hrt_entries.json and measures, with tracemalloc, the
+memory still allocated after loading it in two forms:
+
+  dicts    the plain JSON dicts returned by load_entries
+  records  the compact EntryRecord / MedRecord form the EntryStore keeps
+           (slots instead of per-object dicts, interned repeated strings)
+
+Example:
+
+    python benchmarks/bench_memory.py --entries 100000 --json
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from _app import isolate_app_data, load_app
+from datasets import generate_entries, parse_mix, write_dataset
+
+
+def measure(build_list):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        data = build_list()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return data, {"retained_bytes": current - before, "peak_bytes": peak - before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", default="beta", help="beta, mini or a path to hrt-tracker.py")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--mix", default="", help="medication weights, e.g. estradiol_oral=5,spironolactone=2")
+    parser.add_argument("--note-words", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    data_dir = isolate_app_data()
+    write_dataset(data_dir, generate_entries(args.entries, parse_mix(args.mix), args.note_words))
+    hrt = load_app(args.build)
+
+    results = {}
+    dicts, results["dicts"] = measure(hrt.load_entries)
+    del dicts
+    store = hrt.EntryStore()
+    records, results["records"] = measure(store.entries)
+    del records
+    saved = results["dicts"]["retained_bytes"] - results["records"]["retained_bytes"]
+    reduction = saved / results["dicts"]["retained_bytes"] * 100.0 if results["dicts"]["retained_bytes"] else 0.0
+
+    if args.json:
+        print(json.dumps({"entries": args.entries, "results": results, "reduction_pct": reduction}, indent=2))
+        return
+    for form, r in results.items():
+        print(f"{form:>8}: {r['retained_bytes'] / 1e6:8.1f} MB retained, {r['peak_bytes'] / 1e6:8.1f} MB peak")
+    print(f"reduction: {reduction:.1f}% at {args.entries} entries")
+
+
+if __name__ == "__main__":
+    main()
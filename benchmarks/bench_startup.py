@@ -0,0 +1,78 @@
+"""
+Time-to-first-frame benchmark for the tracker window.
+
+Each run is a fresh interpreter (cold imports) that builds HRTTrackerApp,
+processes events until the first frame is drawn, and exits. Two modes
+are compared:
+
+  lazy   pages are built on first show (the default behavior)
+  eager  every registered page is built before the first frame, which is
+         what the app did before pages were registered as factories; rows
+         those pages hand to the task runner are built before the frame
+         too, as they were when rows were created synchronously
+
+Needs a display. Example:
+
+    python benchmarks/bench_startup.py --build beta --runs 7
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+_T0 = time.perf_counter()
+
+from _app import isolate_app_data, load_app, require_display, settle  # noqa: E402
+
+
+def child(build, mode):
+    isolate_app_data()
+    app_module = load_app(build)
+    app = app_module.HRTTrackerApp()
+    if mode == "eager":
+        for name in app.page_order:
+            app._ensure_page(name)
+        settle(app)
+    app.update()
+    elapsed_ms = (time.perf_counter() - _T0) * 1000.0
+    app.destroy()
+    print(json.dumps({"mode": mode, "first_frame_ms": elapsed_ms}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", default="beta", help="beta, mini or a path to hrt-tracker.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--child", choices=("lazy", "eager"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.build, args.child)
+        return
+
+    require_display("Time-to-first-frame")
+    results = {}
+    for mode in ("eager", "lazy"):
+        samples = []
+        for _ in range(args.runs):
+            out = subprocess.run(
+                [sys.executable, __file__, "--build", args.build, "--child", mode],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            samples.append(json.loads(out)["first_frame_ms"])
+        results[mode] = {"median_ms": statistics.median(samples), "samples_ms": samples}
+
+    if args.json:
+        print(json.dumps({"build": args.build, "results": results}, indent=2))
+        return
+    for mode, r in results.items():
+        print(f"{mode:>5}: median {r['median_ms']:.1f} ms over {args.runs} runs")
+    eager, lazy = results["eager"]["median_ms"], results["lazy"]["median_ms"]
+    print(f"lazy page construction saves {eager - lazy:.1f} ms ({100 * (eager - lazy) / eager:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
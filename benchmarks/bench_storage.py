@@ -0,0 +1,166 @@
+"""
+Storage and search benchmark (headless, no Tk windows).
+
+For each dataset size a synthetic hrt_entries.json is written into a
+throwaway data folder, then these operations are timed with the app's
+own functions:
+
+  load_entries     parse the entries file
+  first_page       read the newest 50 entries from the end of the file
+                   (what History shows while a large file streams in)
+  stream_load      parse the file incrementally with iter_json_array
+  save_entries     atomic write of the full list (the last-saved digest is
+                   forgotten before each repeat so every save really writes)
+  save_unchanged   save of a list identical to the file, i.e. the no-op path
+                   where save_json matches the digest and skips the write
+  filter_query     HistoryPage search (text query)
+  filter_dates     HistoryPage date-range filter
+  filter_both      query and date range together
+  delete_by_key    locate an entry by (timestamp, regimen) and save the rest
+  export           write the filtered list as an export file
+
+Results are written as JSON (with Python version and git revision) so
+successive runs can be compared with --compare. Example:
+
+    python benchmarks/bench_storage.py --sizes 1000,10000,100000 --out results.json
+    python benchmarks/bench_storage.py --sizes 1000,10000,100000 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+
+from _app import REPO_ROOT, isolate_app_data, load_app
+from datasets import generate_entries, parse_mix, write_dataset
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return result, {"median_ms": statistics.median(samples), "min_ms": min(samples), "samples_ms": samples}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_size(hrt, data_dir, size, args):
+    entries = generate_entries(size, parse_mix(args.mix), args.note_words, seed=args.seed)
+    write_dataset(data_dir, entries)
+    file_bytes = os.path.getsize(hrt.DATA_FILE)
+    # a window in the middle of the data, and a query that matches a few percent
+    mid = entries[size // 2]["timestamp"][:10]
+    start = date.fromisoformat(mid)
+    end = date.fromordinal(start.toordinal() + 30)
+    query = "pharmacy refill"
+    del entries
+
+    ops = {}
+    loaded, ops["load_entries"] = timed(hrt.load_entries, args.repeat)
+    _, ops["first_page"] = timed(lambda: hrt.read_json_array_tail(hrt.DATA_FILE, 50), args.repeat)
+    _, ops["stream_load"] = timed(lambda: list(hrt.iter_json_array(hrt.DATA_FILE)), args.repeat)
+
+    def save_forced():
+        hrt._PERSISTED.clear()
+        return hrt.save_entries(loaded)
+
+    before = dict(hrt.WRITE_STATS)
+    _, ops["save_entries"] = timed(save_forced, args.repeat)
+    _, ops["save_unchanged"] = timed(lambda: hrt.save_entries(loaded), args.repeat)
+    saves = {k: hrt.WRITE_STATS[k] - before[k] for k in before}
+    matched, ops["filter_query"] = timed(lambda: hrt.filter_entries(loaded, query), args.repeat)
+    _, ops["filter_dates"] = timed(lambda: hrt.filter_entries(loaded, "", start, end), args.repeat)
+    _, ops["filter_both"] = timed(lambda: hrt.filter_entries(loaded, query, start, end), args.repeat)
+
+    target = dict(loaded[size // 2])
+
+    def delete_by_key():
+        current = hrt.load_entries()
+        idx = hrt.find_entry_index(current, target)
+        del current[idx]
+        hrt.save_entries(current)
+        # put it back so every repeat deletes from the same file
+        current.insert(idx, target)
+        hrt.save_entries(current)
+
+    _, ops["delete_by_key"] = timed(delete_by_key, args.repeat)
+    export_path = os.path.join(data_dir, "export.json")
+    _, ops["export"] = timed(lambda: hrt.export_entries(export_path, matched), args.repeat)
+    return {"entries": size, "file_bytes": file_bytes, "query_matches": len(matched),
+            "saves": saves, "ops": ops}
+
+
+def compare(previous, current):
+    old = {r["entries"]: r for r in previous.get("results", [])}
+    print(f"\ncompared with {previous.get('git_revision')} ({previous.get('taken')})")
+    for r in current["results"]:
+        before = old.get(r["entries"])
+        if not before:
+            continue
+        for op, st in r["ops"].items():
+            b = before["ops"].get(op)
+            if not b or not b["median_ms"]:
+                continue
+            change = (st["median_ms"] - b["median_ms"]) / b["median_ms"] * 100.0
+            print(f"{r['entries']:>9} {op:<14} {b['median_ms']:>10.2f} -> {st['median_ms']:>10.2f} ms  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", default="beta", help="beta, mini or a path to hrt-tracker.py")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated entry counts (up to 1000000)")
+    parser.add_argument("--mix", default="", help="medication weights, e.g. estradiol_oral=5,spironolactone=2")
+    parser.add_argument("--note-words", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write results JSON to this file")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    data_dir = isolate_app_data()
+    hrt = load_app(args.build)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        r = bench_size(hrt, data_dir, size, args)
+        results.append(r)
+        print(f"{size:>9} entries ({r['file_bytes'] / 1e6:.1f} MB, "
+              f"saves written {r['saves']['written']}, skipped {r['saves']['skipped']})")
+        for op, st in r["ops"].items():
+            print(f"          {op:<14} median {st['median_ms']:>10.2f} ms")
+
+    report = {
+        "benchmark": "storage",
+        "build": args.build,
+        "taken": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"mix": args.mix, "note_words": args.note_words, "repeat": args.repeat, "seed": args.seed},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Theme switch latency with a large History list on screen.
+
+Writes a synthetic entries file (5,000 entries by default), opens the
+History page and waits until the task runner has built every row, then
+times Light <-> Dark switches until the window has processed all
+pending redraws and queued work:
+
+  current  HRTTrackerApp.apply_theme (CustomTkinter's own appearance
+           tracking plus the "appearance" topic for plain-Tk pages)
+  legacy   the previous implementation: set_appearance_mode followed by a
+           recursive update_idletasks walk over the whole widget tree and
+           again over every page
+
+Needs a display. Example:
+
+    python benchmarks/bench_theme.py --entries 5000 --switches 6
+"""
+import argparse
+import json
+import statistics
+import time
+
+from _app import isolate_app_data, load_app, require_display, settle
+from datasets import generate_entries, write_dataset
+
+
+def legacy_apply_theme(app, ctk, appearance):
+    ctk.set_appearance_mode(appearance)
+
+    def _refresh(widget):
+        widget.update_idletasks()
+        for child in widget.winfo_children():
+            _refresh(child)
+
+    _refresh(app)
+    for page in app.pages.values():
+        _refresh(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", default="beta", help="beta, mini or a path to hrt-tracker.py")
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--switches", type=int, default=6)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    require_display("Theme switch latency")
+    data_dir = isolate_app_data()
+    write_dataset(data_dir, generate_entries(args.entries, note_words=0, meds_per_entry=1))
+    hrt = load_app(args.build)
+
+    app = hrt.HRTTrackerApp()
+    app.show_page("History")
+    # rows are built in slices after show_page returns
+    settle(app)
+    widgets = 0
+    stack = [app]
+    while stack:
+        w = stack.pop()
+        widgets += 1
+        stack.extend(w.winfo_children())
+
+    def run(apply):
+        samples = []
+        for i in range(args.switches):
+            mode = "Dark" if i % 2 == 0 else "Light"
+            t0 = time.perf_counter()
+            apply(mode)
+            settle(app)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+        return samples
+
+    results = {
+        "legacy": run(lambda mode: legacy_apply_theme(app, hrt.ctk, mode)),
+        "current": run(app.apply_theme),
+    }
+    app.destroy()
+
+    summary = {
+        "entries": args.entries,
+        "widgets": widgets,
+        "results": {k: {"median_ms": statistics.median(v), "samples_ms": v} for k, v in results.items()},
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{args.entries} entries, {widgets} widgets in the tree")
+    for name, r in summary["results"].items():
+        print(f"{name:>7}: median {r['median_ms']:.1f} ms per switch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare two startup profiles written by the tracker's --profile-startup mode.
+
+Profiles live in the app data folder as startup_profile-<build>.json, so a
+Beta and a Mini run (or a before/after pair) can be compared directly:
+
+    python benchmarks/compare_startup.py \
+        "%APPDATA%/HRT Tracker/startup_profile-hrt-tracker-beta.json" \
+        "%APPDATA%/HRT Tracker/startup_profile-hrt-tracker-mini.json" --fail-over 20
+
+Phases are matched by name (repeated names are summed). With --fail-over,
+the exit status is 1 when the total or any phase longer than --min-ms got
+slower by more than that many percent.
+"""
+import argparse
+import json
+import sys
+
+
+def phase_totals(profile):
+    totals = {}
+    for ph in profile.get("phases", []):
+        totals[ph["name"]] = totals.get(ph["name"], 0.0) + ph["duration_ms"]
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--fail-over", type=float, default=None, metavar="PCT")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore smaller phases when failing")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        cand = json.load(f)
+    bt, ct = phase_totals(base), phase_totals(cand)
+    names = list(bt) + [n for n in ct if n not in bt]
+    names.append("TOTAL")
+    bt["TOTAL"], ct["TOTAL"] = base.get("total_ms", 0.0), cand.get("total_ms", 0.0)
+
+    print(f"{'phase':40} {base.get('build', 'baseline')[:14]:>14} {cand.get('build', 'candidate')[:14]:>14} {'delta':>10}")
+    regressions = []
+    for name in names:
+        b, c = bt.get(name, 0.0), ct.get(name, 0.0)
+        pct = (c - b) / b * 100 if b else 0.0
+        print(f"{name[:40]:40} {b:12.1f}ms {c:12.1f}ms {c - b:+9.1f}ms")
+        if args.fail_over is not None and max(b, c) >= args.min_ms and pct > args.fail_over:
+            regressions.append(f"{name}: {pct:+.0f}%")
+
+    if regressions:
+        print("\nregressions over {:.0f}%: {}".format(args.fail_over, ", ".join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
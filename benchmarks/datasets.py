@@ -0,0 +1,139 @@
+"""
+Synthetic, realistic data files for the tracker.
+
+Entries follow the layout HRTLogPage.save_entry writes: one or more
+medications per entry drawn from a weighted mix, a few log times per
+day, occasional dose changes, moods, symptoms and notes of configurable
+length. Output is deterministic for a given seed.
+
+Can also be run directly to write files into a data folder:
+
+    python benchmarks/datasets.py --entries 100000 --out /tmp/hrt-data
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# (name, unit, route, typical doses, weight in the mix)
+MEDICATIONS = {
+    "estradiol_oral": ("Estradiol (oral)", "mg", "Oral", ["1", "2", "4", "6"], 5),
+    "estradiol_patch": ("Estradiol patch", "mcg", "Transdermal", ["50", "100", "200"], 2),
+    "estradiol_inj": ("Estradiol valerate", "ml", "Injection", ["0.2", "0.25", "0.5"], 2),
+    "spironolactone": ("Spironolactone", "mg", "Oral", ["50", "100", "200"], 3),
+    "progesterone": ("Progesterone", "mg", "Oral", ["100", "200"], 1),
+    "testosterone": ("Testosterone cypionate", "ml", "Injection", ["0.25", "0.5"], 2),
+    "finasteride": ("Finasteride", "mg", "Oral", ["1", "5"], 1),
+}
+MOODS = ["Happy", "Neutral", "Low", "Anxious", "Energetic", "Tired"]
+SYMPTOMS = [
+    "breast tenderness", "fatigue", "headache", "hot flashes", "mood swings",
+    "nausea", "dizziness", "skin changes", "insomnia", "low libido",
+]
+NOTE_WORDS = (
+    "felt good today slept well took dose with breakfast skipped coffee bloodwork "
+    "next week clinic appointment pharmacy refill reminder energy steady calm busy "
+    "day walk outside journaling therapy session friends dinner tired evening"
+).split()
+RESOURCE_TAGS = ["clinic", "guide", "community", "legal", "pharmacy", "support"]
+
+
+def parse_mix(text):
+    """"estradiol_oral=5,spironolactone=2" -> {key: weight}; empty means the default mix."""
+    if not text:
+        return {k: v[4] for k, v in MEDICATIONS.items()}
+    mix = {}
+    for part in text.split(","):
+        key, _, weight = part.partition("=")
+        key = key.strip()
+        if key not in MEDICATIONS:
+            raise ValueError(f"unknown medication {key!r}; choose from {', '.join(MEDICATIONS)}")
+        mix[key] = float(weight or 1)
+    return mix
+
+
+def generate_entries(count, mix=None, note_words=20, meds_per_entry=2, per_day=2,
+                     start=datetime(2018, 1, 1, 8, 0), seed=1):
+    """Return count entries in chronological order."""
+    rng = random.Random(seed)
+    mix = mix or parse_mix("")
+    keys = list(mix)
+    weights = [mix[k] for k in keys]
+    # each person stays on a regimen for weeks, changing one dose now and then
+    regimen = {k: MEDICATIONS[k][3][0] for k in rng.choices(keys, weights, k=meds_per_entry)}
+    minutes_apart = 24 * 60 // max(1, per_day)
+    entries = []
+    for i in range(count):
+        if rng.random() < 0.01:
+            key = rng.choice(list(regimen))
+            if rng.random() < 0.1:
+                # switch medication rather than dose
+                del regimen[key]
+                key = rng.choices(keys, weights)[0]
+            regimen[key] = rng.choice(MEDICATIONS[key][3])
+        ts = start + timedelta(minutes=i * minutes_apart + rng.randint(0, 30))
+        meds = []
+        for key, dose in regimen.items():
+            name, unit, route, _, _ = MEDICATIONS[key]
+            meds.append({"name": name, "dose": dose, "unit": unit, "route": route,
+                         "time": ts.strftime("%H:%M")})
+        n_words = max(0, int(rng.gauss(note_words, note_words / 3))) if note_words else 0
+        entries.append({
+            "timestamp": ts.strftime("%Y-%m-%d %H:%M"),
+            "title": "",
+            "regimen": meds[0]["name"] if meds else "",
+            "route": meds[0]["route"] if meds else "",
+            "dose": "",
+            "mood": rng.choice(MOODS),
+            "symptoms": ", ".join(rng.sample(SYMPTOMS, rng.randint(0, 2))),
+            "notes": " ".join(rng.choice(NOTE_WORDS) for _ in range(n_words)),
+            "medications": meds,
+        })
+    return entries
+
+
+def generate_resources(count, seed=1):
+    rng = random.Random(seed)
+    resources = []
+    for i in range(count):
+        resources.append({
+            "title": f"Resource {i}",
+            "url": f"https://example.org/resource/{i}",
+            "tags": ", ".join(rng.sample(RESOURCE_TAGS, rng.randint(1, 3))),
+            "notes": " ".join(rng.choice(NOTE_WORDS) for _ in range(rng.randint(0, 15))),
+        })
+    return resources
+
+
+def write_dataset(data_dir, entries=None, resources=None):
+    """Write hrt_entries.json / hrt_resources.json into data_dir (created if needed)."""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    if entries is not None:
+        with open(data_dir / "hrt_entries.json", "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+    if resources is not None:
+        with open(data_dir / "hrt_resources.json", "w", encoding="utf-8") as f:
+            json.dump(resources, f, indent=2, ensure_ascii=False)
+    return data_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--resources", type=int, default=100)
+    parser.add_argument("--mix", default="", help="medication weights, e.g. estradiol_oral=5,spironolactone=2")
+    parser.add_argument("--note-words", type=int, default=20, help="average words per note")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", required=True, help="folder to write the JSON files into")
+    args = parser.parse_args()
+
+    entries = generate_entries(args.entries, parse_mix(args.mix), args.note_words, seed=args.seed)
+    resources = generate_resources(args.resources, seed=args.seed)
+    out = write_dataset(args.out, entries, resources)
+    print(f"wrote {len(entries)} entries and {len(resources)} resources to {out}")
+
+
+if __name__ == "__main__":
+    main()
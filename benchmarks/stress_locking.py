@@ -0,0 +1,96 @@
+"""
+Concurrent writers stress test (headless, no Tk windows).
+
+Starts several processes on one shared data folder. Each one appends
+entries through EntryStore.append, the same path HRTLogPage.save_entry
+uses. Afterwards the entries file must contain every entry exactly once.
+
+  locked    EntryStore.append (FileLock around the read-modify-write)
+  unlocked  load_entries / append / save_entries with no lock held across
+            the cycle, i.e. how saves worked before; expected to lose entries
+
+Exits non-zero if the locked mode loses or duplicates anything. Example:
+
+    python benchmarks/stress_locking.py --procs 6 --entries 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from _app import isolate_app_data, load_app
+
+
+def worker(build, mode, worker_id, count):
+    hrt = load_app(build)
+    store = hrt.EntryStore()
+    for i in range(count):
+        entry = {
+            "timestamp": f"2024-01-01 {worker_id:02d}:{i % 60:02d}",
+            "regimen": "Estradiol (oral)",
+            "notes": f"worker {worker_id} entry {i}",
+        }
+        if mode == "locked":
+            ok = store.append(entry)
+        else:
+            entries = hrt.load_entries()
+            entries.append(entry)
+            ok = hrt.save_entries(entries)
+        if not ok:
+            print(f"worker {worker_id}: save {i} failed", file=sys.stderr)
+
+
+def run(build, mode, procs, count):
+    data_dir = isolate_app_data()
+    started = time.perf_counter()
+    children = [
+        subprocess.Popen([
+            sys.executable, __file__, "--build", build, "--worker", mode,
+            "--worker-id", str(n), "--entries", str(count),
+        ], env=dict(os.environ))
+        for n in range(procs)
+    ]
+    for child in children:
+        child.wait()
+    elapsed = time.perf_counter() - started
+    with open(data_dir / "hrt_entries.json", "r", encoding="utf-8") as f:
+        notes = [e.get("notes") for e in json.load(f)]
+    expected = {f"worker {w} entry {i}" for w in range(procs) for i in range(count)}
+    return {
+        "mode": mode,
+        "expected": len(expected),
+        "found": len(notes),
+        "lost": len(expected - set(notes)),
+        "duplicated": len(notes) - len(set(notes)),
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", default="beta", help="beta, mini or a path to hrt-tracker.py")
+    parser.add_argument("--procs", type=int, default=6)
+    parser.add_argument("--entries", type=int, default=50, help="entries appended per process")
+    parser.add_argument("--modes", default="locked,unlocked")
+    parser.add_argument("--worker", choices=("locked", "unlocked"), help=argparse.SUPPRESS)
+    parser.add_argument("--worker-id", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.build, args.worker, args.worker_id, args.entries)
+        return
+
+    failed = False
+    for mode in (m.strip() for m in args.modes.split(",") if m.strip()):
+        r = run(args.build, mode, args.procs, args.entries)
+        print(f"{mode:>8}: {r['found']}/{r['expected']} entries, {r['lost']} lost, "
+              f"{r['duplicated']} duplicated ({r['seconds']:.1f} s)")
+        if mode == "locked" and (r["lost"] or r["duplicated"]):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()